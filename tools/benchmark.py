@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Benchmark the plugin's stages against a synthetic settings tree.
+
+Generates a settings archive with satellites.xml, a v4 lamedb, one
+userbouquet per position and a few theme bouquets spanning all positions,
+then drives the real screen with the enigma stand-ins from tools/e2stubs
+and reports wall time and peak Python memory per stage:
+
+    python3 tools/benchmark.py [--positions 100] [--services 100000] [--select 10]
+
+Wall times come from an untraced run (best of --repeat); peak memory is
+measured in a separate run under tracemalloc. Run it before and after a
+change to spot regressions that would hurt low-end receivers.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "usr", "lib", "enigma2", "python"), os.path.join(ROOT, "tools", "e2stubs")]
+
+from Components.config import config  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite import plugin  # noqa: E402,F401 - defines the config entries
+from Plugins.Extensions.CiefpSelectSatellite import satxml, ui  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite.archive import SettingsArchive  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite.manifest import build_manifest  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite.positions import format_position  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite.preview import build_preview  # noqa: E402
+from Plugins.Extensions.CiefpSelectSatellite.services import filter_service_bouquets  # noqa: E402
+
+TOP_FOLDER = "ciefp-E2-75E-34W"
+THEME_BOUQUETS = 5
+TRANSPONDERS_PER_POSITION = 40
+
+
+class Session:
+    def open(self, *args, **kwargs):
+        pass
+
+    def openWithCallback(self, callback, *args, **kwargs):
+        pass
+
+
+def namespace_for(position):
+    return "%08x" % ((position + 3600 if position < 0 else position) << 16)
+
+
+def generate(root, positions, services):
+    """Write a synthetic settings archive under root; returns (archive path, positions list)."""
+    position_list = [-300 + index * 6 for index in range(positions)]
+    per_position = max(services // positions, 1)
+    files = {}
+
+    lines = ['<?xml version="1.0" encoding="iso-8859-1"?>\n<satellites>\n']
+    for position in position_list:
+        lines.append('\t<sat name="Satellite %s" flags="0" position="%d">\n' % (format_position(position), position))
+        for number in range(TRANSPONDERS_PER_POSITION):
+            lines.append('\t\t<transponder frequency="%d" symbol_rate="27500000" polarization="%d" '
+                         'fec_inner="3" system="1" modulation="2" />\n' % (10700000 + number * 20000, number % 2))
+        lines.append('\t</sat>\n')
+    lines.append('</satellites>\n')
+    files["satellites.xml"] = "".join(lines)
+
+    transponders = ["eDVB services /4/\n", "transponders\n"]
+    service_lines = ["services\n"]
+    references = {}
+    for position in position_list:
+        namespace = namespace_for(position)
+        references[position] = []
+        for number in range(per_position):
+            tsid = number % TRANSPONDERS_PER_POSITION + 1
+            if number < TRANSPONDERS_PER_POSITION:
+                transponders.append("%s:%04x:0001\n\ts %d:27500000:%d:3:%d:2:0\n/\n"
+                                    % (namespace, tsid, 10700000 + number * 20000, number % 2, position))
+            sid = number + 1
+            service_lines.append("%04x:%s:%04x:0001:1:0\nService %d %s\np:Provider\n"
+                                 % (sid, namespace, tsid, sid, format_position(position)))
+            references[position].append("1:0:1:%X:%X:1:%s:0:0:0:" % (sid, tsid, namespace.upper().lstrip("0")))
+    transponders.append("end\n")
+    service_lines.append("end\n")
+    files["lamedb"] = "".join(transponders + service_lines)
+
+    def section(position, refs):
+        marker = "#SERVICE 1:64:%d:0:0:0:0:0:0:0::| Satellite %s |::\n#DESCRIPTION | Satellite %s |\n" % (
+            position_list.index(position), format_position(position), format_position(position))
+        return marker + "".join("#SERVICE %s\n#DESCRIPTION Service\n" % ref for ref in refs)
+
+    bouquet_names = []
+    for index, position in enumerate(position_list):
+        name = "userbouquet.ciefp_sat%03d.tv" % index
+        files[name] = "#NAME Satellite %s\n" % format_position(position) + section(position, references[position])
+        bouquet_names.append(name)
+    for theme in range(THEME_BOUQUETS):
+        name = "userbouquet.theme%d.tv" % theme
+        files[name] = "#NAME Theme %d\n" % theme + "".join(
+            section(position, references[position][theme::THEME_BOUQUETS]) for position in position_list)
+        bouquet_names.append(name)
+    files["bouquets.tv"] = "#NAME User - bouquets (TV)\n" + "".join(
+        '#SERVICE 1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "%s" ORDER BY bouquet\n' % name for name in bouquet_names)
+    files["bouquets.radio"] = "#NAME User - bouquets (Radio)\n"
+
+    archive_path = os.path.join(root, "cache", "settings.zip")
+    os.makedirs(os.path.dirname(archive_path))
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr("%s/%s" % (TOP_FOLDER, name), content)
+    return archive_path, position_list
+
+
+def measure(stage, repeat, trace):
+    """Return (best wall time, peak traced bytes or None) for stage(), hiding its log output."""
+    best = None
+    peak = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            stage()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if trace:
+            gc.collect()
+            tracemalloc.start()
+            stage()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the plugin on a synthetic settings tree.")
+    parser.add_argument("--positions", type=int, default=100, help="orbital positions (default: 100)")
+    parser.add_argument("--services", type=int, default=100000, help="services in lamedb (default: 100000)")
+    parser.add_argument("--select", type=int, default=10, help="satellites to select (default: 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, best is reported")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tree")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="ciefp-bench-")
+    try:
+        start = time.perf_counter()
+        archive_path, position_list = generate(root, args.positions, args.services)
+        print("Generated %d positions, %d services in %.2f s (%s, %.1f MB)" % (
+            len(position_list), args.services, time.perf_counter() - start,
+            archive_path, os.path.getsize(archive_path) / 1048576.0))
+
+        settings_dir = os.path.join(root, "settings")
+        selected_dir = os.path.join(root, "selected")
+        filter_dir = os.path.join(root, "filter")
+        config.plugins.CiefpSelectSatellite.cache_dir.value = os.path.dirname(archive_path)
+        config.plugins.CiefpSelectSatellite.prune_satellites.value = True
+        ui.TMP_DOWNLOAD = settings_dir
+        ui.TMP_SELECTED = selected_dir
+
+        with SettingsArchive(archive_path) as archive:
+            manifest = build_manifest(archive, "bench")
+            archive.extract(manifest.common_files, settings_dir)
+        screen = ui.CiefpSelectSatellite(Session())
+        screen.manifest = manifest
+        screen.bouquet_index = manifest.index
+        step = max(len(position_list) // max(args.select, 1), 1)
+        picks = list(range(0, len(position_list), step))[:args.select]
+        selected = set(position_list[index] for index in picks)
+
+        def manifest_stage():
+            with SettingsArchive(archive_path) as archive:
+                build_manifest(archive, "bench")
+
+        def preview_stage():
+            with SettingsArchive(archive_path) as archive:
+                screen.preview = build_preview(os.path.join(settings_dir, "lamedb"), archive, manifest)
+
+        def parse_stage():
+            # Measure a real parse, not a hit in read_satellites' in-memory cache
+            satxml._satellite_cache.clear()
+            screen.parse_satellites()
+
+        def filter_stage():
+            if os.path.exists(filter_dir):
+                shutil.rmtree(filter_dir)
+            os.makedirs(filter_dir)
+            paths = []
+            for name in manifest.shared_bouquets():
+                shutil.copy(os.path.join(settings_dir, name), filter_dir)
+                paths.append(os.path.join(filter_dir, name))
+            filter_service_bouquets(paths, selected, os.path.join(settings_dir, "lamedb"))
+
+        def select_stage():
+            screen.selection.clear()
+            for index in picks:
+                screen["left_list"].moveToIndex(index)
+                screen.select_item()
+
+        def copy_stage():
+            if os.path.exists(selected_dir):
+                shutil.rmtree(selected_dir)
+            screen.copy_files()
+
+        stages = [
+            ("build_manifest", manifest_stage),
+            ("build_preview", preview_stage),
+            ("parse_satellites", parse_stage),
+            ("filter_services", filter_stage),
+            ("select_item x%d" % len(picks), select_stage),
+            ("copy_files", copy_stage),
+        ]
+        print("%-20s %12s %14s" % ("stage", "wall ms", "peak MB"))
+        for name, stage in stages:
+            elapsed, peak = measure(stage, args.repeat, not args.no_memory)
+            print("%-20s %12.1f %14s" % (name, elapsed * 1000.0,
+                                         "-" if peak is None else "%.2f" % (peak / 1048576.0)))
+        print("status: %s" % screen["status"].getText())
+        print("max RSS: %.1f MB" % (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0))
+    finally:
+        if args.keep:
+            print("Kept %s" % root)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Check how much it costs enigma2 to import the plugin descriptor at boot.
+
+Runs ``python -X importtime`` on the descriptor module with the enigma
+stand-ins from tools/e2stubs on the path, prints the slowest imports and
+fails when the descriptor takes longer than the budget or pulls in one of
+the modules that must only load once the screen is opened.
+
+    python3 tools/check_importtime.py [--budget-ms 25]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHON_DIR = os.path.join(ROOT, "usr", "lib", "enigma2", "python")
+STUBS_DIR = os.path.join(ROOT, "tools", "e2stubs")
+DESCRIPTOR = "Plugins.Extensions.CiefpSelectSatellite.plugin"
+HEAVY_MODULES = ["requests", "urllib3", "zipfile", "shutil", "xml.etree.ElementTree",
+                 "concurrent.futures", "threading", "json"]
+
+
+def import_times(module):
+    """Return {module: (self_us, cumulative_us)} for everything importing module loads.
+
+    ``-X importtime`` lists a module after the imports it triggered, indented
+    one level deeper, so the subtree is the run of deeper lines above it.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([PYTHON_DIR, STUBS_DIR]), PYTHONDONTWRITEBYTECODE="1")
+    code = "import %s" % module
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            env=env, stderr=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("Importing %s failed." % module)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    for end, (depth, name, self_us, cumulative_us) in enumerate(entries):
+        if name == module:
+            break
+    else:
+        return {}
+    times = {name: (self_us, cumulative_us)}
+    for child_depth, child, child_self, child_cumulative in reversed(entries[:end]):
+        if child_depth <= depth:
+            break
+        times[child] = (child_self, child_cumulative)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget for the plugin descriptor.")
+    parser.add_argument("--budget-ms", type=float, default=25.0,
+                        help="maximum cumulative import time of the descriptor (default: 25)")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    times = import_times(DESCRIPTOR)
+    if DESCRIPTOR not in times:
+        raise SystemExit("No import time reported for %s." % DESCRIPTOR)
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+        print("%8.2f ms  %s" % (self_us / 1000.0, name))
+
+    failures = []
+    total_ms = times[DESCRIPTOR][1] / 1000.0
+    print("%s: %.2f ms (budget %.2f ms)" % (DESCRIPTOR, total_ms, args.budget_ms))
+    if total_ms > args.budget_ms:
+        failures.append("descriptor import took %.2f ms" % total_ms)
+    loaded = [name for name in HEAVY_MODULES if name in times]
+    if loaded:
+        failures.append("descriptor import loaded %s" % ", ".join(loaded))
+    for failure in failures:
+        print("FAIL: " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+class ActionMap:
+    def __init__(self, contexts, actions, prio=0):
+        self.actions = actions
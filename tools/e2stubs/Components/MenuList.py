@@ -0,0 +1,28 @@
+class MenuList:
+    def __init__(self, entries, enableWrapAround=False):
+        self.list = entries
+        self.index = 0
+
+    def setList(self, entries):
+        self.list = entries
+
+    def getCurrent(self):
+        return self.list[self.index] if self.list else None
+
+    def getSelectedIndex(self):
+        return self.index
+
+    def moveToIndex(self, index):
+        self.index = index
+
+    def up(self):
+        self.index = max(self.index - 1, 0)
+
+    def down(self):
+        self.index = min(self.index + 1, max(len(self.list) - 1, 0))
+
+    def pageUp(self):
+        self.up()
+
+    def pageDown(self):
+        self.down()
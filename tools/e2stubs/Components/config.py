@@ -0,0 +1,26 @@
+class ConfigElement:
+    def __init__(self, default=None, **kwargs):
+        self.value = default
+
+    def save(self):
+        pass
+
+
+class ConfigText(ConfigElement):
+    pass
+
+
+class ConfigYesNo(ConfigElement):
+    pass
+
+
+class ConfigInteger(ConfigElement):
+    pass
+
+
+class ConfigSubsection:
+    pass
+
+
+config = ConfigSubsection()
+config.plugins = ConfigSubsection()
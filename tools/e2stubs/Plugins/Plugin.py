@@ -0,0 +1,12 @@
+class PluginDescriptor:
+    WHERE_PLUGINMENU = "pluginmenu"
+    WHERE_EXTENSIONSMENU = "extensionsmenu"
+    WHERE_SESSIONSTART = "sessionstart"
+    WHERE_AUTOSTART = "autostart"
+
+    def __init__(self, name="", description="", where=None, icon=None, fnc=None, **kwargs):
+        self.name = name
+        self.description = description
+        self.where = where
+        self.icon = icon
+        self.fnc = fnc
@@ -0,0 +1,10 @@
+class Screen(dict):
+    def __init__(self, session):
+        dict.__init__(self)
+        self.session = session
+        self.onLayoutFinish = []
+        self.onClose = []
+
+    def close(self, *args):
+        for callback in self.onClose:
+            callback()
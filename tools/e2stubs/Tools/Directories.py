@@ -0,0 +1,5 @@
+import os
+
+
+def fileExists(path, mode="r"):
+    return os.path.exists(path)
@@ -0,0 +1,50 @@
+"""Minimal stand-ins for the enigma C++ bindings used by the plugin."""
+
+
+class _Signal(list):
+    pass
+
+
+class eTimer:
+    def __init__(self):
+        self.callback = _Signal()
+
+    def start(self, interval, single_shot=False):
+        pass
+
+    def startLongTimer(self, seconds):
+        pass
+
+    def stop(self):
+        pass
+
+    def isActive(self):
+        return False
+
+
+class eConsoleAppContainer:
+    def __init__(self):
+        self.appClosed = _Signal()
+        self.dataAvail = _Signal()
+
+    def execute(self, command):
+        return 0
+
+    def kill(self):
+        pass
+
+
+class eDVBDB:
+    _instance = None
+
+    @classmethod
+    def getInstance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def reloadServicelist(self):
+        pass
+
+    def reloadBouquets(self):
+        pass
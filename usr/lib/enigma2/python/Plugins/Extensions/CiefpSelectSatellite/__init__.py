@@ -1 +1 @@
-from .plugin import PLUGIN_NAME, PLUGIN_VERSION, PLUGIN_DESCRIPTION
+from .constants import PLUGIN_NAME, PLUGIN_VERSION, PLUGIN_DESCRIPTION
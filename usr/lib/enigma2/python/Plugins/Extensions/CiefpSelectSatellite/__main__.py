@@ -0,0 +1,118 @@
+"""Headless entry point for prebuilding settings on a build host.
+
+    python -m CiefpSelectSatellite build --positions 19.2E,13.0E --out dir
+    python -m CiefpSelectSatellite build --positions 19.2E --positions 13.0E,16.0E --jobs 4 --out dir
+    python -m CiefpSelectSatellite list
+
+Run it from the Extensions directory (or with that directory on PYTHONPATH).
+The settings archive is downloaded once into the cache directory and every
+position set is built from it, in parallel processes when there are several.
+"""
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import SettingsCache
+from .constants import GITHUB_API_URL, STATIC_NAMES
+from .core import fetch_settings, load_satellites, stage_selection
+from .github import ManifestResolver
+from .positions import format_position, parse_position
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ciefpselectsatellite")
+
+
+def parse_position_set(text):
+    positions = []
+    for item in text.split(','):
+        position = parse_position(item.strip())
+        if position is None:
+            raise argparse.ArgumentTypeError(f"not an orbital position: {item.strip()!r}")
+        positions.append(position)
+    return positions
+
+
+def build_one(job):
+    settings_dir, archive_path, manifest, positions, out_dir, prune_lamedb, prune_satellites, archive_format, quiet = job
+    report = None if quiet else (lambda text: print(f"{out_dir}: {text}", file=sys.stderr))
+    stage_selection(settings_dir, archive_path, manifest, set(positions), out_dir,
+                    prune_lamedb_file=prune_lamedb, prune_satellites_file=prune_satellites, report=report)
+    if archive_format:
+        return shutil.make_archive(out_dir, archive_format, out_dir)
+    return out_dir
+
+
+def prepare(args):
+    cache = SettingsCache(args.cache_dir)
+    resolver = ManifestResolver(GITHUB_API_URL, STATIC_NAMES, cache)
+    settings_dir = os.path.join(args.cache_dir, "settings")
+    report = None if args.quiet else (lambda text: print(text, file=sys.stderr))
+    manifest = fetch_settings(resolver, settings_dir, report)
+    return settings_dir, cache.archive_path, manifest
+
+
+def cmd_list(args):
+    settings_dir, archive_path, manifest = prepare(args)
+    for name, position in load_satellites(os.path.join(settings_dir, "satellites.xml"), manifest.index):
+        print(f"{format_position(position)}\t{name}")
+    return 0
+
+
+def cmd_build(args):
+    settings_dir, archive_path, manifest = prepare(args)
+    unknown = sorted(set(position for positions in args.positions for position in positions) - set(manifest.index))
+    if unknown:
+        print(f"no bouquets for {', '.join(format_position(position) for position in unknown)}; "
+              f"run 'list' for the available positions", file=sys.stderr)
+        return 1
+    jobs = []
+    for positions in args.positions:
+        if len(args.positions) == 1:
+            out_dir = args.out
+        else:
+            out_dir = os.path.join(args.out, "_".join(format_position(position) for position in positions))
+        if os.path.isdir(out_dir) and os.listdir(out_dir):
+            if not args.force:
+                print(f"{out_dir} is not empty, use --force to replace it", file=sys.stderr)
+                return 1
+            shutil.rmtree(out_dir)
+        jobs.append((settings_dir, archive_path, manifest, positions, out_dir,
+                     not args.keep_lamedb, args.prune_satellites, args.archive, args.quiet))
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(build_one, jobs))
+    else:
+        results = [build_one(job) for job in jobs]
+    for result in results:
+        print(result)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="CiefpSelectSatellite", description="Prebuild ciefp settings for selected satellites.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="where the downloaded settings are cached")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report download progress and build statistics")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    build = commands.add_parser("build", help="build settings for one or more position sets")
+    build.add_argument("--positions", type=parse_position_set, action="append", required=True,
+                       help="comma separated positions, e.g. 19.2E,13.0E; repeat for more sets")
+    build.add_argument("--out", required=True, help="output directory")
+    build.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel builds (default: CPU count)")
+    build.add_argument("--keep-lamedb", action="store_true", help="do not prune lamedb to the selection")
+    build.add_argument("--prune-satellites", action="store_true", help="prune satellites.xml to the selection")
+    build.add_argument("--force", action="store_true", help="replace existing output directories")
+    build.add_argument("--archive", choices=("zip", "gztar"), help="also package each build as an archive")
+    build.set_defaults(func=cmd_build)
+
+    satellites = commands.add_parser("list", help="list the satellites that have bouquets")
+    satellites.set_defaults(func=cmd_list)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import os
+import shutil
+import zipfile
+import zlib
+
+COPY_BUFFER = 64 * 1024
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def verify_archive(path, size=None):
+    """Raise ArchiveError unless path is a complete ZIP whose members pass their CRC check.
+
+    ``size`` is the size announced by the listing; a file of any other size
+    is truncated or not the announced archive.
+    """
+    actual = os.path.getsize(path)
+    if size and actual != size:
+        raise ArchiveError(f"Archive is {actual} bytes, expected {size}.")
+    try:
+        with zipfile.ZipFile(path, 'r') as archive:
+            bad = archive.testzip()
+    except (zipfile.BadZipFile, zlib.error, EOFError, OSError) as e:
+        raise ArchiveError(f"Archive is damaged: {e}")
+    if bad is not None:
+        raise ArchiveError(f"CRC check failed for {bad}.")
+
+
+class SettingsArchive:
+    """Read-only view of the settings ZIP keyed by file name.
+
+    The archive wraps everything in one top-level folder; members are
+    addressed by their path below it. Members are streamed straight from
+    the archive, so files that are not asked for never hit the disk.
+    """
+
+    def __init__(self, zip_path):
+        self.zip_path = zip_path
+        self.zip = zipfile.ZipFile(zip_path, 'r')
+        self.members = {}
+        for info in self.zip.infolist():
+            if info.filename.endswith('/'):
+                continue
+            parts = info.filename.split('/', 1)
+            name = parts[1] if len(parts) == 2 else parts[0]
+            self.members[name] = info
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def size(self, name):
+        return self.members[name].file_size
+
+    def open(self, name):
+        return self.zip.open(self.members[name])
+
+    def copy_member(self, name, dest_path):
+        with self.open(name) as src, open(dest_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER)
+
+    def extract(self, names, target_dir, should_stop=None):
+        """Extract the given members that exist into target_dir, returning their names."""
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir)
+        extracted = []
+        for name in names:
+            if name not in self.members or os.path.dirname(name):
+                continue
+            if should_stop is not None:
+                should_stop()
+            self.copy_member(name, os.path.join(target_dir, name))
+            extracted.append(name)
+        return extracted
+
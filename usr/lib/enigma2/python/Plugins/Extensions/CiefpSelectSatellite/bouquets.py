@@ -0,0 +1,78 @@
+import os
+import re
+
+from .positions import parse_position
+
+SAT_MARKER_REGEX = re.compile(r'#SERVICE \d+:\d+:[\w\d]+:.*::\| (.+?) \|::')
+NUMERIC_SAT_REGEX = re.compile(r'(\d+\.\d+[EW])')
+
+
+def marker_position(line):
+    """Return the position named in a '#SERVICE 1:64' satellite marker as signed tenths, or None."""
+    match = SAT_MARKER_REGEX.search(line)
+    if match:
+        numeric_match = NUMERIC_SAT_REGEX.search(match.group(1).strip())
+        if numeric_match:
+            return parse_position(numeric_match.group(1))
+    return None
+
+
+def bouquet_reference(line):
+    """Return the userbouquet file a 'FROM BOUQUET' line points to, or None."""
+    if "FROM BOUQUET" not in line:
+        return None
+    start = line.find('"') + 1
+    end = line.find('"', start)
+    if start == 0 or end == -1:
+        return None
+    return line[start:end]
+
+
+def read_bouquet_list(path):
+    """Return bouquets.tv/.radio as an ordered list of (line, userbouquet file or None)."""
+    entries = []
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append((line + "\n", bouquet_reference(line)))
+    return entries
+
+
+def prune_bouquet_list(path, available):
+    """Drop the entries of bouquets.tv/.radio whose userbouquet is not in ``available``.
+
+    The file is replaced rather than rewritten, since it may be a hardlink
+    into the settings cache. Returns the number of entries dropped.
+    """
+    entries = read_bouquet_list(path)
+    kept = [line for line, name in entries if name is None or name in available]
+    with open(path + ".tmp", 'w') as f:
+        f.writelines(kept)
+    os.replace(path + ".tmp", path)
+    return len(entries) - len(kept)
+
+
+def merge_bouquet_lists(installed, new, ciefp_names, available):
+    """Merge a new bouquets.tv/.radio into the installed one, keeping foreign entries.
+
+    Entries of the installed list whose file is not in ``ciefp_names`` (the
+    user's own and IPTV bouquets, and any other line) stay where they are.
+    The ciefp block is replaced in place by the new list's entries whose file
+    is in the ``available`` set, at the position of the first installed
+    ciefp entry, or appended when there was none.
+    """
+    block = [(line, name) for line, name in new if name is not None and name in available]
+    if not installed:
+        return [(line, name) for line, name in new if name is None] + block
+    merged = []
+    inserted = False
+    for line, name in installed:
+        if name is None or name not in ciefp_names:
+            merged.append((line, name))
+        elif not inserted:
+            merged.extend(block)
+            inserted = True
+    if not inserted:
+        merged.extend(block)
+    return merged
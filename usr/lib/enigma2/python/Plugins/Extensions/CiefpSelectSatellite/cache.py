@@ -0,0 +1,116 @@
+import json
+import os
+
+INDEX_FILE = "cache.json"
+ARCHIVE_FILE = "settings.zip"
+STAMP_FILE = ".ciefp_sha"
+
+
+class SettingsCache:
+    """Persistent cache of the settings archive and its GitHub metadata.
+
+    The index remembers the ETag of the contents listing and the name, sha,
+    size and ETag of the cached archive, so unchanged settings can be
+    revalidated with conditional requests instead of downloaded again.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.archive_path = os.path.join(cache_dir, ARCHIVE_FILE)
+        self.partial_path = self.archive_path + ".part"
+        self.index = self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if isinstance(index, dict):
+                return index
+        except (IOError, OSError, ValueError):
+            pass
+        return {}
+
+    def save(self):
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.rename(tmp_path, self.index_path)
+
+    def listing_etag(self):
+        return self.index.get("listing_etag")
+
+    def cached_listing(self):
+        return self.index.get("listing")
+
+    def store_listing(self, etag, listing):
+        self.index["listing_etag"] = etag
+        self.index["listing"] = listing
+        self.save()
+
+    def archive(self):
+        return self.index.get("archive") or {}
+
+    def has_archive(self, entry):
+        """True when the cached archive matches the listing entry's sha."""
+        archive = self.archive()
+        return (archive.get("sha") == entry.get("sha")
+                and archive.get("name") == entry.get("name")
+                and os.path.isfile(self.archive_path))
+
+    def archive_etag(self, entry):
+        archive = self.archive()
+        if archive.get("name") == entry.get("name") and os.path.isfile(self.archive_path):
+            return archive.get("etag")
+        return None
+
+    def store_archive(self, entry, etag):
+        self.index["archive"] = {
+            "name": entry.get("name"),
+            "sha": entry.get("sha"),
+            "size": entry.get("size"),
+            "etag": etag,
+        }
+        self.save()
+
+    def partial_size(self, entry):
+        """Bytes of an interrupted download of entry that can be resumed, or 0."""
+        partial = self.index.get("partial") or {}
+        if partial.get("sha") != entry.get("sha") or partial.get("name") != entry.get("name"):
+            return 0
+        try:
+            return os.path.getsize(self.partial_path)
+        except OSError:
+            return 0
+
+    def partial_etag(self):
+        return (self.index.get("partial") or {}).get("etag")
+
+    def store_partial(self, entry, etag):
+        self.index["partial"] = {"name": entry.get("name"), "sha": entry.get("sha"), "etag": etag}
+        self.save()
+
+    def clear_partial(self):
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+        if self.index.pop("partial", None) is not None:
+            self.save()
+
+    def is_extracted(self, target_dir, entry):
+        """True when target_dir already holds the extracted archive for entry."""
+        try:
+            with open(os.path.join(target_dir, STAMP_FILE), 'r') as f:
+                return f.read().strip() == entry.get("sha")
+        except (IOError, OSError):
+            return False
+
+    def clear_extracted(self, target_dir):
+        stamp = os.path.join(target_dir, STAMP_FILE)
+        if os.path.exists(stamp):
+            os.remove(stamp)
+
+    def mark_extracted(self, target_dir, entry):
+        with open(os.path.join(target_dir, STAMP_FILE), 'w') as f:
+            f.write(entry.get("sha") or "")
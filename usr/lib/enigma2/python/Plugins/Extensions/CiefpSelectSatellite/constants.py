@@ -0,0 +1,12 @@
+PLUGIN_VERSION = "1.9"
+PLUGIN_ICON = "plugin.png"
+PLUGIN_NAME = "CiefpSelectSatellite"
+PLUGIN_DESCRIPTION = "Satellite Selection Plugin"
+TMP_DOWNLOAD = "/tmp/ciefp-E2-75E-34W"
+TMP_SELECTED = "/tmp/CiefpSelectSatellite"
+GITHUB_API_URL = "https://api.github.com/repos/ciefp/ciefpsettings-enigma2-zipped/contents/"
+STATIC_NAMES = ["ciefp-E2-75E-34W"]
+TREE_API_URL = "https://api.github.com/repos/ciefp/ciefpsettings-enigma2/contents/ciefp-E2-75E-34W"
+
+INSTALLER_URL = "https://raw.githubusercontent.com/ciefp/CiefpSelectSatellite/main/installer.sh"
+UPDATE_COMMAND = f"wget -q --no-check-certificate {INSTALLER_URL} -O - | /bin/sh"
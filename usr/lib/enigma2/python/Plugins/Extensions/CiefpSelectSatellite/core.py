@@ -0,0 +1,151 @@
+"""Download, parse, select and filter steps shared by the screen and the CLI.
+
+Nothing here imports enigma or Components, so settings can be prebuilt on
+any Linux host.
+"""
+import json
+import os
+import shutil
+
+from .archive import SettingsArchive
+from .bouquets import prune_bouquet_list
+from .installer import file_hash
+from .lamedb import prune_lamedb
+from .satxml import prune_satellites_xml, read_satellites
+from .services import filter_service_bouquets
+
+STAGING_MANIFEST = ".staging.json"
+
+
+def fetch_settings(resolver, target_dir, report=None):
+    """Run the download worker and return the settings manifest.
+
+    The status lines are passed to ``report`` as the worker posts them.
+    """
+    from .downloader import SettingsDownloader
+    downloader = SettingsDownloader(resolver, target_dir)
+    downloader.start()
+    while True:
+        kind, payload = downloader.messages.get()
+        if kind == "done":
+            return payload
+        if kind == "error":
+            raise Exception(payload)
+        if kind == "cancelled":
+            raise Exception("Download did not complete.")
+        if report is not None and kind in ("status", "version"):
+            report(payload)
+
+
+def load_satellites(xml_path, index):
+    """Return (name, position) for every <sat> in satellites.xml that has bouquets in index."""
+    return [(name, position) for name, position, flags in read_satellites(xml_path) if position in index]
+
+
+def link_or_copy(src, dest):
+    """Hardlink src to dest, copying when the filesystem does not allow it."""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy(src, dest)
+
+
+def read_staging(out_dir):
+    """Return the staging manifest's files, name -> {"md5", "size", "source"}, or None."""
+    try:
+        with open(os.path.join(out_dir, STAGING_MANIFEST), 'r') as f:
+            return json.load(f)["files"]
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+
+
+def stage_selection(settings_dir, archive_path, manifest, positions, out_dir,
+                    prune_lamedb_file=True, prune_satellites_file=False, keep_positions=(), report=None):
+    """Rebuild out_dir with exactly the settings for the selected positions.
+
+    The set is assembled in a fresh sibling directory and swapped in, so
+    nothing from an earlier selection survives. Files taken unchanged from
+    the extracted settings_dir are hardlinked. Satellite bouquets that are
+    only in the archive, the shared TV and radio bouquets filtered down to
+    the selection and lamedb/satellites.xml pruned on request are written
+    as new files; the filters replace a file rather than edit it, so
+    linked files are never modified. ``keep_positions`` are extra
+    positions kept in satellites.xml. bouquets.tv/.radio keep only the
+    userbouquets in the set. A staging manifest records the name, md5,
+    size and source of every file in the set. What was pruned and
+    filtered is passed to ``report`` as text. Returns (files, ServiceStats
+    of the bouquet filter).
+    """
+    staging = out_dir.rstrip(os.sep) + ".new"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    sources = {}
+
+    for f in manifest.common_files:
+        src = os.path.join(settings_dir, f)
+        if os.path.exists(src):
+            link_or_copy(src, os.path.join(staging, f))
+            sources[f] = "linked"
+
+    lamedb_path = os.path.join(staging, "lamedb")
+    if prune_lamedb_file and positions and os.path.exists(lamedb_path):
+        stats = prune_lamedb(lamedb_path, positions)
+        sources["lamedb"] = "pruned"
+        if report is not None:
+            report(f"lamedb pruned: {stats}")
+
+    satellites_path = os.path.join(staging, "satellites.xml")
+    if prune_satellites_file and positions and os.path.exists(satellites_path):
+        kept, dropped = prune_satellites_xml(satellites_path, set(positions) | set(keep_positions))
+        sources["satellites.xml"] = "pruned"
+        if report is not None:
+            report(f"satellites.xml pruned: {kept} kept, {dropped} dropped")
+
+    archive = SettingsArchive(archive_path) if os.path.exists(archive_path) else None
+    try:
+        for position in positions:
+            for bouquet_file in manifest.index.get(position) or []:
+                src = os.path.join(settings_dir, bouquet_file)
+                dest = os.path.join(staging, bouquet_file)
+                if bouquet_file in sources:
+                    continue
+                if os.path.exists(src):
+                    link_or_copy(src, dest)
+                    sources[bouquet_file] = "linked"
+                elif archive is not None and bouquet_file in archive:
+                    archive.copy_member(bouquet_file, dest)
+                    sources[bouquet_file] = "archive"
+    finally:
+        if archive is not None:
+            archive.close()
+
+    shared = [name for name in manifest.shared_bouquets() if name in sources]
+    filtered, service_stats = filter_service_bouquets([os.path.join(staging, name) for name in shared],
+                                                      positions, lamedb_path)
+    for name in shared:
+        if name in filtered:
+            sources[name] = "filtered"
+        elif report is not None:
+            report(f"{name}: nothing left after filtering, kept unfiltered")
+    if report is not None:
+        report(f"Bouquets filtered: {service_stats}")
+
+    for top in ("bouquets.tv", "bouquets.radio"):
+        if top in sources:
+            dropped = prune_bouquet_list(os.path.join(staging, top), sources)
+            sources[top] = "pruned"
+            if report is not None and dropped:
+                report(f"{top}: {dropped} entries without a staged bouquet dropped")
+
+    files = {}
+    for name, source in sources.items():
+        path = os.path.join(staging, name)
+        files[name] = {"md5": file_hash(path), "size": os.path.getsize(path), "source": source}
+    with open(os.path.join(staging, STAGING_MANIFEST), 'w') as f:
+        json.dump({"positions": list(positions), "files": files}, f)
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.rename(staging, out_dir)
+    return files, service_stats
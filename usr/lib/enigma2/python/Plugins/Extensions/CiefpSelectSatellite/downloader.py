@@ -0,0 +1,243 @@
+import os
+import queue
+import shutil
+import threading
+
+import requests
+
+from .archive import ArchiveError, SettingsArchive, verify_archive
+from .github import TIMEOUT
+from .manifest import build_manifest, load_manifest, save_manifest
+from .preview import build_preview, load_preview, save_preview
+from .treefetch import TreeUnavailable, tree_manifest
+
+CHUNK_SIZE = 64 * 1024
+RETRIES = 4
+BACKOFF = 2
+BACKOFF_MAX = 60
+LOW_PRIORITY = 19
+
+# Only one worker at a time writes the cache and the extracted settings
+RUN_LOCK = threading.Lock()
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def lower_thread_priority():
+    """Give the calling thread the lowest CPU priority, where Linux allows per-thread nice."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), LOW_PRIORITY)
+    except (AttributeError, OSError):
+        pass
+
+
+class SettingsDownloader(threading.Thread):
+    """Fetches the settings listing and archive from GitHub off the GUI thread.
+
+    The worker never touches the screen; it posts ``(kind, payload)`` tuples
+    into ``messages`` and the screen drains the queue from an eTimer on the
+    main loop. Kinds are ``status``, ``version``, ``preview`` (with the
+    per-position preview), ``done`` (with the settings manifest),
+    ``cancelled`` and ``error``.
+    """
+
+    def __init__(self, resolver, target_dir, low_priority=False, tree=None):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.resolver = resolver
+        self.target_dir = target_dir
+        self.low_priority = low_priority
+        self.tree = tree
+        self.source = None
+        self.cache = resolver.cache
+        self.zip_path = self.cache.archive_path
+        self.messages = queue.Queue()
+        self.bytes_received = 0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def post(self, kind, payload=None):
+        self.messages.put((kind, payload))
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise DownloadCancelled()
+
+    def run(self):
+        if self.low_priority:
+            lower_thread_priority()
+        if not RUN_LOCK.acquire(False):
+            self.post("status", "Waiting for the running settings update...")
+            while not RUN_LOCK.acquire(True, 0.5):
+                if self.cancelled():
+                    self.post("cancelled")
+                    return
+        try:
+            self.download()
+        finally:
+            RUN_LOCK.release()
+
+    def download(self):
+        try:
+            if self.tree is not None:
+                try:
+                    self.download_tree()
+                    return
+                except TreeUnavailable as e:
+                    self.post("status", f"Per-file source unavailable ({e}), downloading the archive...")
+            self.source = "archive"
+            self.post("status", "Fetching file list from GitHub...")
+            entry = self.resolver.archive_entry()
+            self.post("version", self.resolver.settings_version())
+            self.check_cancelled()
+            manifest = load_manifest(self.cache.cache_dir, entry.get("sha"))
+            preview = load_preview(self.cache.cache_dir, entry.get("sha"))
+            if manifest is not None and preview is not None and self.cache.is_extracted(self.target_dir, entry):
+                self.post("status", "Settings are up to date.")
+                self.post("preview", preview)
+                self.post("done", manifest)
+                return
+            if not self.cache.has_archive(entry):
+                self.fetch_archive(entry)
+                self.check_cancelled()
+            self.post("status", "Extracting settings...")
+            with SettingsArchive(self.zip_path) as archive:
+                if manifest is None:
+                    manifest = build_manifest(archive, entry.get("sha"))
+                    save_manifest(self.cache.cache_dir, manifest)
+                self.extract_archive(archive, manifest.common_files)
+                if preview is None:
+                    preview = build_preview(os.path.join(self.target_dir, "lamedb"), archive, manifest)
+                    save_preview(self.cache.cache_dir, preview)
+            self.cache.mark_extracted(self.target_dir, entry)
+            self.post("preview", preview)
+            self.post("done", manifest)
+        except DownloadCancelled:
+            self.post("cancelled")
+        except Exception as e:
+            self.post("error", str(e))
+
+    def download_tree(self):
+        """Fetch only the common files from the repository tree; bouquets follow per selection."""
+        self.post("status", "Fetching file list from the settings repository...")
+        self.tree.load()
+        manifest = tree_manifest(self.tree)
+        self.check_cancelled()
+        if not os.path.exists(self.target_dir):
+            os.makedirs(self.target_dir)
+        self.cache.clear_extracted(self.target_dir)
+        self.post("status", f"Downloading {len(manifest.common_files)} settings files...")
+        self.bytes_received += self.tree.fetch(manifest.common_files, self.target_dir, self.check_cancelled)
+        self.source = "tree"
+        # tree.version() changes with any file, so the preview is built once per settings version
+        preview = load_preview(self.cache.cache_dir, manifest.version)
+        if preview is None:
+            preview = build_preview(os.path.join(self.target_dir, "lamedb"), self.tree, manifest)
+            save_preview(self.cache.cache_dir, preview)
+        self.post("preview", preview)
+        self.post("done", manifest)
+
+    def fetch_archive(self, entry):
+        """Download the archive, retrying failed attempts with exponential backoff.
+
+        Connection errors, timeouts, server errors and archives that fail
+        verification are retried; what was received is kept in the .part
+        file and later attempts resume from there.
+        """
+        delay = BACKOFF
+        for attempt in range(RETRIES + 1):
+            try:
+                return self.fetch_archive_once(entry)
+            except (requests.RequestException, ArchiveError) as e:
+                if attempt == RETRIES or not self.retryable(e):
+                    raise
+                self.post("status", f"Download failed ({e}), retrying in {delay}s...")
+                if self._cancelled.wait(delay):
+                    raise DownloadCancelled()
+                delay = min(delay * 2, BACKOFF_MAX)
+
+    def retryable(self, error):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status >= 500 or status in (408, 429)
+        return True
+
+    def fetch_archive_once(self, entry):
+        headers = {}
+        offset = self.cache.partial_size(entry)
+        etag = self.cache.archive_etag(entry)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            partial_etag = self.cache.partial_etag()
+            if partial_etag and not partial_etag.startswith("W/"):
+                headers["If-Range"] = partial_etag
+        elif etag:
+            headers["If-None-Match"] = etag
+        response = self.resolver.session.get(entry["download_url"], headers=headers, stream=True, timeout=TIMEOUT)
+        if response.status_code == 304:
+            response.close()
+            self.cache.store_archive(entry, etag)
+            return
+        if response.status_code == 416:
+            # The partial file does not fit the archive on the server any more
+            response.close()
+            self.cache.clear_partial()
+            raise ArchiveError("Partial download does not match, restarting.")
+        response.raise_for_status()
+        if not os.path.exists(self.cache.cache_dir):
+            os.makedirs(self.cache.cache_dir)
+        if response.status_code != 206:
+            offset = 0
+            self.cache.store_partial(entry, response.headers.get("ETag"))
+        part_path = self.cache.partial_path
+        length = int(response.headers.get("Content-Length") or 0)
+        total = offset + length if length else int(entry.get("size") or 0)
+        received = offset
+        last_text = None
+        try:
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    self.check_cancelled()
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    received += len(chunk)
+                    self.bytes_received += len(chunk)
+                    text = self.progress_text(received, total)
+                    if text != last_text:
+                        self.post("status", text)
+                        last_text = text
+        finally:
+            response.close()
+        self.post("status", "Verifying settings archive...")
+        try:
+            verify_archive(part_path, entry.get("size"))
+        except ArchiveError:
+            self.cache.clear_partial()
+            raise
+        archive_etag = response.headers.get("ETag") or self.cache.partial_etag()
+        os.replace(part_path, self.zip_path)
+        self.cache.clear_partial()
+        self.cache.store_archive(entry, archive_etag)
+
+    def progress_text(self, received, total):
+        if total:
+            return f"Downloading settings from GitHub... {received * 100 // total}%"
+        return f"Downloading settings from GitHub... {received // 1024 // 100 * 100} KB"
+
+    def extract_archive(self, archive, names):
+        """Extract the common files; per-satellite bouquets stay in the archive."""
+        staging = self.target_dir + ".new"
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        archive.extract(names, staging, self.check_cancelled)
+        if os.path.exists(self.target_dir):
+            shutil.rmtree(self.target_dir)
+        os.rename(staging, self.target_dir)
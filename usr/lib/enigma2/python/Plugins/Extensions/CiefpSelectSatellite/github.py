@@ -0,0 +1,80 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TIMEOUT = (10, 30)
+LISTING_TTL = 300
+# Rate limiting and server errors; a cached listing is better than none
+FALLBACK_STATUSES = (403, 429)
+
+
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "CiefpSelectSatellite"
+    return session
+
+
+class ManifestResolver:
+    """Single source of the GitHub contents listing for the settings repo.
+
+    One listing round-trip serves the version display, the archive URL and
+    update checks. The listing is kept in memory for ``ttl`` seconds and
+    revalidated with the persistent ETag from the settings cache afterwards,
+    and all requests share one keep-alive session. When GitHub cannot be
+    reached, rate-limits the box or fails with a server error, the cached
+    listing is used if there is one.
+    """
+
+    def __init__(self, api_url, names, cache, ttl=LISTING_TTL):
+        self.api_url = api_url
+        self.names = names
+        self.cache = cache
+        self.ttl = ttl
+        self.session = create_session()
+        self._lock = threading.Lock()
+        self._listing = None
+        self._fetched_at = 0
+
+    def listing(self):
+        with self._lock:
+            if self._listing is not None and time.time() - self._fetched_at < self.ttl:
+                return self._listing
+            self._listing = self.fetch_listing()
+            self._fetched_at = time.time()
+            return self._listing
+
+    def fetch_listing(self):
+        headers = {}
+        etag = self.cache.listing_etag()
+        listing = self.cache.cached_listing()
+        if etag and listing:
+            headers["If-None-Match"] = etag
+        try:
+            response = self.session.get(self.api_url, headers=headers, timeout=TIMEOUT)
+        except requests.RequestException:
+            if listing:
+                return listing
+            raise
+        if response.status_code == 304:
+            return listing
+        if listing and (response.status_code in FALLBACK_STATUSES or response.status_code >= 500):
+            response.close()
+            return listing
+        response.raise_for_status()
+        listing = response.json()
+        self.cache.store_listing(response.headers.get("ETag"), listing)
+        return listing
+
+    def archive_entry(self):
+        for file in self.listing():
+            if any(name in file["name"] for name in self.names) and file["name"].endswith(".zip"):
+                return file
+        raise Exception("No matching ZIP file found on GitHub.")
+
+    def settings_version(self):
+        return self.archive_entry()["name"].replace(".zip", "")
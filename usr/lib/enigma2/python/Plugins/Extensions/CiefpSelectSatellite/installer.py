@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import shutil
+
+BACKUP_INDEX = "backup.json"
+HASH_BUFFER = 64 * 1024
+
+
+def file_hash(path):
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def staging_dir_for(dest_dir):
+    """Sibling of dest_dir on the same filesystem, so os.replace is atomic."""
+    parent, name = os.path.split(os.path.normpath(dest_dir))
+    return os.path.join(parent, f".{name}.ciefp-staging")
+
+
+def fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def copy_synced(src, dest):
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, HASH_BUFFER)
+        fdst.flush()
+        os.fsync(fdst.fileno())
+
+
+class InstallState:
+    """Hashes of the files the plugin has installed, keyed by destination path.
+
+    An entry is trusted while the installed file keeps the size and mtime
+    recorded with it, so unchanged files are compared without rereading them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        try:
+            with open(path, 'r') as f:
+                self.files = json.load(f)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def installed_hash(self, dest):
+        try:
+            st = os.stat(dest)
+        except OSError:
+            return None
+        entry = self.files.get(dest)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            return entry["md5"]
+        return file_hash(dest)
+
+    def record(self, dest, digest):
+        st = os.stat(dest)
+        self.files[dest] = {"md5": digest, "size": st.st_size, "mtime": st.st_mtime}
+
+    def forget(self, dest):
+        self.files.pop(dest, None)
+
+    def installed(self):
+        return list(self.files)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path + ".tmp", 'w') as f:
+            json.dump(self.files, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class InstallTransaction:
+    """Installs a set of files into live directories as one batch.
+
+    Every changed file is first written and fsynced into a staging dir next
+    to its destination, the files about to be replaced are snapshotted into
+    ``backup_dir``, and only then are the staged files swapped in with
+    os.replace. A failure during the swap restores the snapshot, and
+    rollback() restores it later on request. Files whose content is already
+    installed are skipped, and files queued with remove() are deleted in the
+    same batch. With an InstallState the installed hashes come from, and are
+    recorded in, its state file.
+    """
+
+    def __init__(self, backup_dir, state=None):
+        self.backup_dir = backup_dir
+        self.state = state
+        self.files = []
+        self.removals = []
+        self.skipped = []
+        self.removed = []
+
+    def add(self, src, dest_dir, name=None, digest=None):
+        """Queue src for dest_dir; digest is its md5 when the caller already knows it."""
+        self.files.append((src, os.path.join(dest_dir, name or os.path.basename(src)), digest))
+
+    def remove(self, dest):
+        if os.path.isfile(dest):
+            self.removals.append(dest)
+        elif self.state is not None:
+            self.state.forget(dest)
+
+    def destinations(self):
+        return set(dest for src, dest, digest in self.files)
+
+    def installed_hash(self, dest):
+        if self.state is not None:
+            return self.state.installed_hash(dest)
+        return file_hash(dest) if os.path.isfile(dest) else None
+
+    def changed_files(self):
+        changed = []
+        for src, dest, digest in self.files:
+            digest = digest or file_hash(src)
+            if os.path.isfile(dest) and os.path.getsize(src) == os.path.getsize(dest) and self.installed_hash(dest) == digest:
+                self.skipped.append((dest, digest))
+            else:
+                changed.append((src, dest, digest))
+        return changed
+
+    def commit(self):
+        """Install the added files; returns the list of destinations written."""
+        changed = self.changed_files()
+        if changed or self.removals:
+            self.apply(changed)
+        if self.state is not None:
+            for dest, digest in self.skipped:
+                self.state.record(dest, digest)
+            for src, dest, digest in changed:
+                self.state.record(dest, digest)
+            for dest in self.removed:
+                self.state.forget(dest)
+            self.state.save()
+        return [dest for src, dest, digest in changed]
+
+    def apply(self, changed):
+        staged = []
+        try:
+            for src, dest, digest in changed:
+                staging = staging_dir_for(os.path.dirname(dest))
+                if not os.path.exists(staging):
+                    os.makedirs(staging)
+                tmp = os.path.join(staging, os.path.basename(dest))
+                copy_synced(src, tmp)
+                staged.append((tmp, dest))
+            for staging in set(os.path.dirname(tmp) for tmp, dest in staged):
+                fsync_dir(staging)
+            self.snapshot([dest for tmp, dest in staged] + self.removals)
+            try:
+                for tmp, dest in staged:
+                    os.replace(tmp, dest)
+                for dest in self.removals:
+                    os.remove(dest)
+                    self.removed.append(dest)
+            except Exception:
+                self.rollback()
+                raise
+            for dest_dir in set(os.path.dirname(dest) for tmp, dest in staged) | set(os.path.dirname(dest) for dest in self.removals):
+                fsync_dir(dest_dir)
+        finally:
+            for staging in set(os.path.dirname(tmp) for tmp, dest in staged):
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def snapshot(self, destinations):
+        """Copy the current versions of destinations into a fresh backup.
+
+        Each entry also notes whether the file was one the plugin had
+        installed, so a rollback can restore the state file along with it.
+        """
+        if os.path.exists(self.backup_dir):
+            shutil.rmtree(self.backup_dir)
+        os.makedirs(self.backup_dir)
+        entries = []
+        for number, dest in enumerate(destinations):
+            entry = {"path": dest, "backup": None,
+                     "owned": self.state is not None and dest in self.state.files}
+            if os.path.isfile(dest):
+                entry["backup"] = str(number)
+                copy_synced(dest, os.path.join(self.backup_dir, entry["backup"]))
+            entries.append(entry)
+        with open(os.path.join(self.backup_dir, BACKUP_INDEX), 'w') as f:
+            json.dump(entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def rollback(self):
+        return restore_backup(self.backup_dir)
+
+
+def has_backup(backup_dir):
+    return os.path.isfile(os.path.join(backup_dir, BACKUP_INDEX))
+
+
+def read_backup(backup_dir):
+    """Return the entries of the last backup: {"path", "backup", "owned"} each."""
+    with open(os.path.join(backup_dir, BACKUP_INDEX), 'r') as f:
+        return json.load(f)
+
+
+def restore_backup(backup_dir):
+    """Put the files saved by the last install back; new files are removed.
+
+    Returns the list of paths restored or removed.
+    """
+    entries = read_backup(backup_dir)
+    staged = []
+    for entry in entries:
+        dest = entry["path"]
+        if entry["backup"] is None:
+            staged.append((None, dest))
+            continue
+        staging = staging_dir_for(os.path.dirname(dest))
+        if not os.path.exists(staging):
+            os.makedirs(staging)
+        tmp = os.path.join(staging, os.path.basename(dest))
+        copy_synced(os.path.join(backup_dir, entry["backup"]), tmp)
+        staged.append((tmp, dest))
+    try:
+        for tmp, dest in staged:
+            if tmp is None:
+                if os.path.exists(dest):
+                    os.remove(dest)
+            else:
+                os.replace(tmp, dest)
+        for dest_dir in set(os.path.dirname(dest) for tmp, dest in staged):
+            fsync_dir(dest_dir)
+    finally:
+        for staging in set(os.path.dirname(tmp) for tmp, dest in staged if tmp is not None):
+            shutil.rmtree(staging, ignore_errors=True)
+    return [dest for tmp, dest in staged]
@@ -0,0 +1,198 @@
+import os
+
+from .positions import namespace_position
+
+
+class LamedbStats:
+    def __init__(self):
+        self.transponders_kept = 0
+        self.transponders_dropped = 0
+        self.services_kept = 0
+        self.services_dropped = 0
+
+    def __str__(self):
+        return (f"{self.transponders_kept} transponders, {self.services_kept} services kept; "
+                f"{self.transponders_dropped} transponders, {self.services_dropped} services dropped")
+
+
+def transponder_key(namespace, tsid, onid):
+    return (int(namespace, 16), int(tsid, 16), int(onid, 16))
+
+
+def is_end(line):
+    """True for the line closing a v4 section.
+
+    Only test it between records: a service name line may itself start
+    with "end".
+    """
+    return line.rstrip() == "end"
+
+
+def keeps_namespace(namespace, positions):
+    position = namespace_position(namespace)
+    return position is None or position in positions
+
+
+def prune_lamedb(path, positions):
+    """Rewrite a v4 or v5 lamedb in place, keeping only the given orbital positions.
+
+    ``positions`` is a set of signed tenths of a degree. Cable and terrestrial
+    transponders are always kept, and a service survives only when its
+    transponder does. The file is processed line by line and replaced only
+    once the filtered copy is complete.
+    """
+    tmp_path = path + ".tmp"
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape') as src, \
+            open(tmp_path, 'w', encoding='utf-8', errors='surrogateescape') as dst:
+        header = src.readline()
+        dst.write(header)
+        if "/5/" in header:
+            stats = filter_v5(src, dst, positions)
+        else:
+            stats = filter_v4(src, dst, positions)
+    os.replace(tmp_path, path)
+    return stats
+
+
+def filter_v4(src, dst, positions):
+    stats = LamedbStats()
+    kept = set()
+    section = None
+    block = []
+    for line in src:
+        if section == "transponders":
+            if not block and is_end(line):
+                section = None
+            else:
+                block.append(line)
+                if line.startswith("/"):
+                    namespace, tsid, onid = block[0].strip().split(':')[:3]
+                    if keeps_namespace(namespace, positions):
+                        kept.add(transponder_key(namespace, tsid, onid))
+                        dst.writelines(block)
+                        stats.transponders_kept += 1
+                    else:
+                        stats.transponders_dropped += 1
+                    block = []
+                continue
+        elif section == "services":
+            if not block and is_end(line):
+                section = None
+            else:
+                block.append(line)
+                if len(block) == 3:
+                    fields = block[0].strip().split(':')
+                    if transponder_key(fields[1], fields[2], fields[3]) in kept:
+                        dst.writelines(block)
+                        stats.services_kept += 1
+                    else:
+                        stats.services_dropped += 1
+                    block = []
+                continue
+        elif line.startswith("transponders"):
+            section = "transponders"
+        elif line.startswith("services"):
+            section = "services"
+        dst.write(line)
+    return stats
+
+
+def filter_v5(src, dst, positions):
+    stats = LamedbStats()
+    kept = set()
+    for line in src:
+        if line.startswith("t:"):
+            namespace, tsid, onid = line[2:].split(',', 1)[0].split(':')[:3]
+            if keeps_namespace(namespace, positions):
+                kept.add(transponder_key(namespace, tsid, onid))
+                stats.transponders_kept += 1
+            else:
+                stats.transponders_dropped += 1
+                continue
+        elif line.startswith("s:"):
+            fields = line[2:].split(',', 1)[0].split(':')
+            if transponder_key(fields[1], fields[2], fields[3]) in kept:
+                stats.services_kept += 1
+            else:
+                stats.services_dropped += 1
+                continue
+        dst.write(line)
+    return stats
+
+
+def position_totals(path):
+    """Count transponders, services and bytes per orbital position in a v4 or v5 lamedb.
+
+    Returns a dict mapping signed tenths of a degree to ``[transponders,
+    services, bytes]``; cable and terrestrial entries are left out.
+    """
+    totals = {}
+
+    def add(namespace, column, size):
+        position = namespace_position(namespace)
+        if position is not None:
+            entry = totals.setdefault(position, [0, 0, 0])
+            entry[column] += 1
+            entry[2] += size
+
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+        header = f.readline()
+        if "/5/" in header:
+            for line in f:
+                if line.startswith("t:"):
+                    add(line[2:].split(':', 1)[0], 0, len(line))
+                elif line.startswith("s:"):
+                    add(line[2:].split(',', 1)[0].split(':')[1], 1, len(line))
+            return totals
+        section = None
+        block = []
+        for line in f:
+            if section is not None and not block and is_end(line):
+                section = None
+            elif section == "transponders":
+                block.append(line)
+                if line.startswith("/"):
+                    add(block[0].split(':', 1)[0].strip(), 0, sum(len(part) for part in block))
+                    block = []
+            elif section == "services":
+                block.append(line)
+                if len(block) == 3:
+                    add(block[0].split(':')[1], 1, sum(len(part) for part in block))
+                    block = []
+            elif line.startswith("transponders"):
+                section = "transponders"
+            elif line.startswith("services"):
+                section = "services"
+    return totals
+
+
+def service_key(sid, namespace, tsid, onid):
+    """Pack a service's identity into one int, so large service sets stay small."""
+    return (int(namespace, 16) << 48) | (int(onid, 16) << 32) | (int(tsid, 16) << 16) | int(sid, 16)
+
+
+def service_keys(path):
+    """Return the set of packed keys of every service in a v4 or v5 lamedb."""
+    keys = set()
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+        header = f.readline()
+        if "/5/" in header:
+            for line in f:
+                if line.startswith("s:"):
+                    fields = line[2:].split(',', 1)[0].split(':')
+                    keys.add(service_key(fields[0], fields[1], fields[2], fields[3]))
+            return keys
+        section = None
+        lines_left = 0
+        for line in f:
+            if section is not None and lines_left == 0 and is_end(line):
+                section = None
+            elif section == "services":
+                if lines_left == 0:
+                    fields = line.strip().split(':')
+                    keys.add(service_key(fields[0], fields[1], fields[2], fields[3]))
+                    lines_left = 3
+                lines_left -= 1
+            elif line.startswith("services"):
+                section = "services"
+    return keys
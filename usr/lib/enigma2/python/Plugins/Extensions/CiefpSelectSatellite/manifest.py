@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import re
+
+from .bouquets import marker_position
+from .mapping import BOUQUET_INDEX, COMMON_FILES
+
+MANIFEST_FILE = "manifest.json"
+BASE_FILES = ['satellites.xml', 'lamedb', 'bouquets.tv', 'bouquets.radio']
+BOUQUET_REF_REGEX = re.compile(r'FROM BOUQUET "([^"]+)"')
+SATELLITE_BOUQUET_PREFIX = "userbouquet.ciefp_"
+
+
+class SettingsManifest:
+    """What a settings archive contains and how it maps to orbital positions.
+
+    ``index`` maps signed tenths of a degree to the satellite's userbouquets
+    and ``common_files`` are installed for every selection.
+    """
+
+    def __init__(self, index, common_files, version=None):
+        self.index = index
+        self.common_files = common_files
+        self.version = version
+
+    def shared_bouquets(self):
+        """Common TV and radio userbouquets, which get filtered down to the selection."""
+        satellite_bouquets = set()
+        for bouquets in self.index.values():
+            satellite_bouquets.update(bouquets)
+        return [name for name in self.common_files
+                if name.startswith("userbouquet.") and name not in satellite_bouquets]
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "index": dict((str(key), bouquets) for key, bouquets in self.index.items()),
+            "common_files": self.common_files,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = {}
+        for key, bouquets in data["index"].items():
+            try:
+                index[int(key)] = bouquets
+            except ValueError:
+                index[key] = bouquets
+        return cls(index, data["common_files"], data.get("version"))
+
+
+def builtin_manifest():
+    return SettingsManifest(BOUQUET_INDEX, COMMON_FILES)
+
+
+def read_lines(archive, name):
+    with archive.open(name) as f:
+        for line in io.TextIOWrapper(f, encoding='utf-8', errors='replace'):
+            yield line
+
+
+def referenced_bouquets(archive):
+    """Userbouquets listed in the archive's bouquets.tv and bouquets.radio, in order."""
+    names = []
+    for top in ('bouquets.tv', 'bouquets.radio'):
+        if top not in archive:
+            continue
+        for line in read_lines(archive, top):
+            match = BOUQUET_REF_REGEX.search(line)
+            if match and match.group(1) in archive and match.group(1) not in names:
+                names.append(match.group(1))
+    return names
+
+
+def bouquet_positions(archive, name):
+    positions = set()
+    for line in read_lines(archive, name):
+        if line.startswith('#SERVICE 1:64'):
+            position = marker_position(line)
+            if position is not None:
+                positions.add(position)
+    return positions
+
+
+def build_manifest(archive, version=None):
+    """Derive the manifest from the bouquets and satellite markers in the archive.
+
+    ciefp_ userbouquets with satellite markers are mapped to every position
+    they mark. Any other referenced bouquet is common. Built-in mapping
+    entries are used for satellite bouquets that carry no markers.
+    """
+    scanned = [(name, bouquet_positions(archive, name)) for name in referenced_bouquets(archive)]
+    index = {}
+    classified = set()
+    for name, positions in scanned:
+        if name.startswith(SATELLITE_BOUQUET_PREFIX) and positions:
+            for position in sorted(positions):
+                index.setdefault(position, []).append(name)
+            classified.add(name)
+    for key, bouquets in BOUQUET_INDEX.items():
+        for name in bouquets:
+            if name in archive and name not in classified and not isinstance(key, str):
+                index.setdefault(key, []).append(name)
+                classified.add(name)
+    common_files = [name for name in BASE_FILES if name in archive]
+    for name, positions in scanned:
+        if name not in classified:
+            common_files.append(name)
+    return SettingsManifest(index, common_files, version)
+
+
+def load_manifest(cache_dir, version):
+    """Return the cached manifest for this settings version, or None."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as f:
+            data = json.load(f)
+        if data.get("version") == version:
+            return SettingsManifest.from_dict(data)
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def save_manifest(cache_dir, manifest):
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(manifest.to_dict(), f)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,209 @@
+from .positions import parse_position
+
+# Ciefp userbouquets per orbital position, as named in the settings archive.
+BOUQUET_MAPPING = {
+    '80.0E': ['userbouquet.ciefp_80e.tv'],
+    '75.0E': ['userbouquet.ciefp_68e.tv'],
+    '70.5E': ['userbouquet.ciefp_68e.tv'],
+    '68.5E': ['userbouquet.ciefp_68e.tv'],
+    '66.0E': ['userbouquet.ciefp_62e.tv'],
+    '62.0E': ['userbouquet.ciefp_62e.tv'],
+    '54.9E': ['userbouquet.ciefp_55e.tv'],
+    '53.0E': ['userbouquet.ciefp_53e.tv'],
+    '52.5E': ['userbouquet.ciefp_53e.tv'],
+    '52.0E': [
+        'userbouquet.ciefp_52e.tv',
+        'userbouquet.ciefp_52e_aref.tv'
+    ],
+    '51.5E': ['userbouquet.ciefp_51e.tv'],
+    '46.0E': ['userbouquet.ciefp_46e.tv'],
+    '45.0E': [
+        'userbouquet.ciefp_45e.tv',
+        'userbouquet.ciefp_45e_vivacom.tv'
+    ],
+    '42.0E': [
+        'userbouquet.ciefp_42e_turksat.tv',
+        'userbouquet.ciefp_42e_digiturk.tv',
+        'userbouquet.ciefp_42e_dsmart.tv',
+        'userbouquet.ciefp_42e_tivibu.tv'
+    ],
+    '39.0E': [
+        'userbouquet.ciefp_39e_hellas.tv',
+        'userbouquet.ciefp_39e_hellas_sport.tv',
+        'userbouquet.ciefp_39e_ert.tv',
+        'userbouquet.ciefp_39e_polaris.tv',
+        'userbouquet.ciefp_39e_dolce.tv',
+        'userbouquet.ciefp_39e_a1bg.tv'
+    ],
+    '36.0E': ['userbouquet.ciefp_36e.tv'],
+    '31.0E': ['userbouquet.ciefp_31e.tv'],
+    '28.2E': [
+        'userbouquet.ciefp_28e_astra.tv',
+        'userbouquet.ciefp_28e_skyuk_icam.tv',
+        'userbouquet.ciefp_28e_skyukmovie.tv',
+        'userbouquet.ciefp_28e_skyukdocuments.tv',
+        'userbouquet.ciefp_28e_skyuksports.tv',
+        'userbouquet.ciefp_28e_skyukkids.tv',
+        'userbouquet.ciefp_28e_skyukgeneral.tv'
+    ],
+    '26.0E': [
+        'userbouquet.ciefp_26e_badr.tv',
+        'userbouquet.ciefp_26e_mbc.tv'
+    ],
+    '23.5E': [
+        'userbouquet.ciefp_23e_astra.tv',
+        'userbouquet.ciefp_23e_skylinkgeneral.tv',
+        'userbouquet.ciefp_23e_skylink.tv',
+        'userbouquet.ciefp_23e_canaldigital.tv',
+        'userbouquet.ciefp_23e_sport.tv',
+        'userbouquet.ciefp_23e_telekomsrbija.tv'
+    ],
+    '21.5E': ['userbouquet.ciefp_21e_eutelsat.tv'],
+    '19.2E': [
+        'userbouquet.ciefp_19e_astra.tv',
+        'userbouquet.ciefp_19e_movistarsport.tv',
+        'userbouquet.ciefp_19e_movistarmovies.tv',
+        'userbouquet.ciefp_19e_movistardocu.tv',
+        'userbouquet.ciefp_19e_skyde_icam.tv',
+        'userbouquet.ciefp_19e_skydemovies.tv',
+        'userbouquet.ciefp_19e_skydedocu.tv',
+        'userbouquet.ciefp_19e_skydesport.tv',
+        'userbouquet.ciefp_19e_hdplus.tv',
+        'userbouquet.ciefp_19e_ORF.tv',
+        'userbouquet.ciefp_19e_fta.tv',
+        'userbouquet.ciefp_19e_canaldigitaal.tv',
+        'userbouquet.ciefp_19e_canalsat.tv'
+    ],
+    '16.1E': [
+        'userbouquet.ciefp_16e_rtsh.tv',
+    ],
+    '16.0E': [
+        'userbouquet.ciefp_16e_eutelsat.tv',
+        'userbouquet.ciefp_16e_oivzagreb.tv',
+        'userbouquet.ciefp_16e_maxtv.tv',
+        'userbouquet.ciefp_16e_pink.tv',
+        'userbouquet.ciefp_16e_antiksat.tv',
+        'userbouquet.ciefp_16e_sport.tv',
+        'userbouquet.ciefp_16e_totaltv.tv',
+        'userbouquet.ciefp_16e_vipnet.tv',
+        'userbouquet.ciefp_16e_digitalbania.tv',
+        'userbouquet.ciefp_16e_freesatromania.tv'
+    ],
+    '13.0E': [
+        'userbouquet.ciefp_13e_hotbird.tv',
+        'userbouquet.ciefp_13e_polandmovies.tv',
+        'userbouquet.ciefp_13e_polanddocu.tv',
+        'userbouquet.ciefp_13e_polandgeneral.tv',
+        'userbouquet.ciefp_13e_polandsport.tv',
+        'userbouquet.ciefp_13e_sfi.tv',
+        'userbouquet.ciefp_13e_orangefrance.tv',
+        'userbouquet.ciefp_13e_raimediaset.tv',
+        'userbouquet.ciefp_13e_vivacom.tv',
+        'userbouquet.ciefp_13e_skyitaliahd.tv',
+        'userbouquet.ciefp_13e_skyitalia_icam.tv',
+        'userbouquet.ciefp_13e_novagreece.tv'
+    ],
+    '10.0E': ['userbouquet.ciefp_10e_eutelsat.tv'],
+    '9.0E': [
+        'userbouquet.ciefp_9e_eutelsat.tv',
+        'userbouquet.ciefp_9e_kabelkiosk.tv',
+        'userbouquet.ciefp_9e_cosmote.tv',
+        'userbouquet.ciefp_9e_afn.tv',
+        'userbouquet.ciefp_9e_mediaset.tv',
+        'userbouquet.ciefp_9e_persidera.tv'
+    ],
+    '7.0E': ['userbouquet.ciefp_7e_eutelsat.tv'],
+    '4.8E': [
+        'userbouquet.ciefp_5e_fta_powervu.tv',
+        'userbouquet.ciefp_5e_ukraina.tv',
+        'userbouquet.ciefp_5e_brt_t2mi.tv'
+    ],
+    '3.0E': ['userbouquet.ciefp_3e_eutelsat.tv'],
+    '1.9E': [
+        'userbouquet.ciefp_2e_bulgariasat1.tv',
+        'userbouquet.ciefp_2e_neosat.tv'
+    ],
+    '0.8W': [
+        'userbouquet.ciefp_08w_thor.tv',
+        'userbouquet.ciefp_08w_sport.tv',
+        'userbouquet.ciefp_08w_docu.tv',
+        'userbouquet.ciefp_08w_music.tv',
+        'userbouquet.ciefp_08w_allente_sve_den.tv',
+        'userbouquet.ciefp_08w_allente_movie_music.tv',
+        'userbouquet.ciefp_08w_directone_svk.tv',
+        'userbouquet.ciefp_08w_directone_movies.tv',
+        'userbouquet.ciefp_08w_focussat.tv',
+        'userbouquet.ciefp_08w_focussat_movies.tv',
+        'userbouquet.ciefp_08w_digitv.tv',
+        'userbouquet.ciefp_08w_slovaktelekom.tv'
+    ],
+    '4.0W': ['userbouquet.ciefp_4w_amos.tv'],
+    '5.0W': [
+        'userbouquet.ciefp_5w_eutelsat.tv',
+        'userbouquet.ciefp_5w_rai.tv',
+        'userbouquet.ciefp_5w_france_multistream.tv',
+        'userbouquet.ciefp_5w_francesat.tv',
+    ],
+    '7.0W': ['userbouquet.ciefp_7w.tv'],
+    '14.0W': ['userbouquet.ciefp_14w.tv'],
+    '22.0W': ['userbouquet.ciefp_15w.tv'],
+    '24.5W': ['userbouquet.ciefp_15w.tv'],
+    '30.0W': [
+        'userbouquet.ciefp_30w_hispasat.tv',
+        'userbouquet.ciefp_30w_hispasatsport.tv',
+        'userbouquet.ciefp_30w_nos.tv',
+        'userbouquet.ciefp_30w_meotv.tv',
+        'userbouquet.ciefp_30w_abertis.tv'
+    ],
+    '34.5W': ['userbouquet.ciefp_35w.tv'],
+    'DVBT/T2': [
+        'userbouquet.ciefp_terrestrial_fta.tv',
+        'userbouquet.ciefp_terrestrial_paytv.tv'
+    ]
+}
+
+# Files installed whatever the selection, used until the archive has been scanned.
+COMMON_FILES = [
+    'satellites.xml', 'lamedb', 'bouquets.tv',
+    'userbouquet.buket_exyu.tv', 'userbouquet.buket_pinktv.tv',
+    'userbouquet.buket_maxtv.tv', 'userbouquet.buket_sport.tv',
+    'userbouquet.buket_kids.tv', 'userbouquet.buket_docu.tv',
+    'userbouquet.buket_movie.tv', 'userbouquet.buket_music.tv',
+    'userbouquet.buket_uhd.tv', 'userbouquet.buket_adult.tv',
+    'userbouquet.buket_multistream.tv', 'userbouquet.buket_emu.tv',
+    'userbouquet.marker_vod_exyu.tv',
+    'userbouquet.ciefp_terrestrial_fta.tv',
+    'userbouquet.ciefp_terrestrial_paytv.tv',
+    'userbouquet.ciefpsettings_iptv_webcam.tv',
+    'userbouquet.ciefpsettings_iptv_exyu.tv',
+    'userbouquet.ciefpsettings_iptv_exyu2.tv',
+    'userbouquet.ciefpsettings_iptv_news_music.tv',
+    'userbouquet.ciefpsettings_iptv_mix.tv',
+    'userbouquet.ciefpsettings_iptv_mix2.tv',
+    'userbouquet.ciefpsettings_iptv_sport.tv',
+    'userbouquet.ciefpsettings_iptv_movies.tv',
+    'userbouquet.ciefpsettings_iptv_movies2.tv',
+    'userbouquet.link_0_marker.tv', 'userbouquet.link_5.tv',
+    'userbouquet.link_3.tv', 'userbouquet.LastScanned.tv',
+    'userbouquet.favourites.tv', 'bouquets.radio',
+    'userbouquet.dbe00.radio', 'userbouquet.ciefpsettings_exyu.radio',
+    'userbouquet.ciefpsettings_slovakia.radio',
+    'userbouquet.ciefpsettings_czech.radio',
+    'userbouquet.ciefpsettings_germany.radio',
+    'userbouquet.ciefpsettings_romania.radio',
+    'userbouquet.favourites.radio'
+]
+
+def build_index(mapping):
+    """Key the mapping by orbital position in signed tenths of a degree.
+
+    Keys without a position (e.g. 'DVBT/T2') are kept under their name.
+    """
+    index = {}
+    for key, bouquets in mapping.items():
+        position = parse_position(key)
+        index[key if position is None else position] = list(bouquets)
+    return index
+
+
+BOUQUET_INDEX = build_index(BOUQUET_MAPPING)
@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+
+LOG_PATH = "/tmp/CiefpSelectSatellite.log"
+LOG_MAX_BYTES = 64 * 1024
+LOG_BACKUPS = 2
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB, or 0 when it cannot be read."""
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (IOError, OSError, ValueError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        return 0
+
+
+def format_bytes(count):
+    if count >= 1024 * 1024:
+        return f"{count / 1048576.0:.1f} MB"
+    if count >= 1024:
+        return f"{count // 1024} KB"
+    return f"{count} B"
+
+
+def directory_size(path):
+    total = 0
+    try:
+        for name in os.listdir(path):
+            full_path = os.path.join(path, name)
+            if os.path.isfile(full_path):
+                total += os.path.getsize(full_path)
+    except OSError:
+        pass
+    return total
+
+
+class StageResult:
+    def __init__(self, stage):
+        self.stage = stage
+        self.seconds = 0.0
+        self.bytes = 0
+        self.peak_rss = 0
+        self.ok = True
+
+    def summary(self):
+        parts = [f"{self.stage} {self.seconds:.2f}s"]
+        if self.bytes:
+            parts.append(format_bytes(self.bytes))
+        if self.peak_rss:
+            parts.append(f"RSS {self.peak_rss // 1024} MB")
+        if not self.ok:
+            parts.append("failed")
+        return ", ".join(parts)
+
+
+class StageMetrics:
+    """Durations, byte counts and peak RSS of the plugin's stages in one run.
+
+    A stage is opened with start() and closed with finish(), which may be
+    on a later main loop iteration (the download runs in a worker). Every
+    finished stage is appended to a small log file that is rotated once it
+    grows past ``max_bytes``, so slow boxes can be diagnosed after the fact.
+    """
+
+    def __init__(self, log_path=LOG_PATH, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.started = {}
+        self.results = OrderedDict()
+
+    def start(self, stage):
+        self.started[stage] = time.monotonic()
+
+    def finish(self, stage, count=0, ok=True):
+        """Close a stage and log it; count is the number of bytes transferred or written."""
+        result = StageResult(stage)
+        started = self.started.pop(stage, None)
+        if started is not None:
+            result.seconds = time.monotonic() - started
+        result.bytes = count
+        result.peak_rss = peak_rss_kb()
+        result.ok = ok
+        self.results[stage] = result
+        self.log(result.summary())
+        return result
+
+    def summary(self, stage=None):
+        """One line for the screen: the given stage, or every stage of this run."""
+        if stage is not None:
+            result = self.results.get(stage)
+            return result.summary() if result else ""
+        if not self.results:
+            return ""
+        parts = [f"{result.stage} {result.seconds:.1f}s" for result in self.results.values()]
+        peak = max(result.peak_rss for result in self.results.values())
+        if peak:
+            parts.append(f"RSS {peak // 1024} MB")
+        return ", ".join(parts)
+
+    def log(self, message):
+        try:
+            self.rotate()
+            with open(self.log_path, 'a') as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} [{self.run_id}] {message}\n")
+        except (IOError, OSError) as e:
+            print(f"[CiefpSelectSatellite] Could not write {self.log_path}: {e}")
+
+    def rotate(self):
+        try:
+            if os.path.getsize(self.log_path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for number in range(self.backups, 0, -1):
+            source = self.log_path if number == 1 else f"{self.log_path}.{number - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.log_path}.{number}")
@@ -0,0 +1,34 @@
+import re
+
+POSITION_REGEX = re.compile(r'(\d+\.\d+)\s*([EW])')
+
+
+def parse_position(text):
+    """Return the orbital position in a name like 'Astra 19.2E' as signed tenths of a degree.
+
+    East is positive and west negative, the same encoding satellites.xml
+    uses in its ``position`` attribute. Returns None when there is none.
+    """
+    match = POSITION_REGEX.search(text)
+    if not match:
+        return None
+    tenths = int(round(float(match.group(1)) * 10))
+    return -tenths if match.group(2) == 'W' else tenths
+
+
+def namespace_position(namespace):
+    """Return the orbital position encoded in a DVB namespace, or None for cable/terrestrial.
+
+    ``namespace`` is the hex string from lamedb or a service reference, or its value.
+    """
+    if isinstance(namespace, str):
+        namespace = int(namespace, 16)
+    position = namespace >> 16
+    if position > 3600:
+        return None
+    return position - 3600 if position > 1800 else position
+
+
+def format_position(position):
+    """Format signed tenths of a degree the way satellite names do, e.g. 192 -> '19.2E'."""
+    return f"{abs(position) / 10.0:.1f}{'W' if position < 0 else 'E'}"
@@ -0,0 +1,76 @@
+import json
+import os
+
+from .lamedb import position_totals
+
+PREVIEW_FILE = "preview.json"
+
+
+class SatellitePreview:
+    """What selecting each orbital position adds to the installed settings.
+
+    ``positions`` maps signed tenths of a degree to ``(services,
+    transponders, bytes)``, where bytes covers the position's lamedb
+    entries and its userbouquets. Built once per settings version.
+    """
+
+    def __init__(self, positions, version=None):
+        self.positions = positions
+        self.version = version
+
+    def get(self, position):
+        return self.positions.get(position, (0, 0, 0))
+
+    def total(self, positions):
+        services = transponders = size = 0
+        for position in positions:
+            entry = self.get(position)
+            services += entry[0]
+            transponders += entry[1]
+            size += entry[2]
+        return services, transponders, size
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "positions": dict((str(key), list(entry)) for key, entry in self.positions.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        positions = dict((int(key), tuple(entry)) for key, entry in data["positions"].items())
+        return cls(positions, data.get("version"))
+
+
+def build_preview(lamedb_path, archive, manifest):
+    """Count the services, transponders and bytes of every position in the manifest index."""
+    totals = position_totals(lamedb_path) if os.path.exists(lamedb_path) else {}
+    positions = {}
+    for position, bouquets in manifest.index.items():
+        if isinstance(position, str):
+            continue
+        transponders, services, size = totals.get(position, (0, 0, 0))
+        size += sum(archive.size(name) for name in bouquets if name in archive)
+        positions[position] = (services, transponders, size)
+    return SatellitePreview(positions, manifest.version)
+
+
+def load_preview(cache_dir, version):
+    """Return the cached preview for this settings version, or None."""
+    try:
+        with open(os.path.join(cache_dir, PREVIEW_FILE), 'r') as f:
+            data = json.load(f)
+        if data.get("version") == version:
+            return SatellitePreview.from_dict(data)
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def save_preview(cache_dir, preview):
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    path = os.path.join(cache_dir, PREVIEW_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(preview.to_dict(), f)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,32 @@
+"""The settings source shared by the screen and the background updater.
+
+Nothing here imports the screen, so the session-start hook can use it
+without loading the UI.
+"""
+from Components.config import config
+
+from .constants import TMP_DOWNLOAD, GITHUB_API_URL, STATIC_NAMES, TREE_API_URL
+
+_resolver = None
+
+
+def get_resolver():
+    """Return the shared manifest resolver, so its listing cache outlives the screen."""
+    global _resolver
+    cache_dir = config.plugins.CiefpSelectSatellite.cache_dir.value
+    if _resolver is None or _resolver.cache.cache_dir != cache_dir:
+        # requests is only loaded once the network is actually needed
+        from .cache import SettingsCache
+        from .github import ManifestResolver
+        _resolver = ManifestResolver(GITHUB_API_URL, STATIC_NAMES, SettingsCache(cache_dir))
+    return _resolver
+
+
+def settings_downloader(low_priority=False, per_file=True):
+    """A SettingsDownloader into TMP_DOWNLOAD, fetching file by file when that is configured."""
+    from .downloader import SettingsDownloader
+    tree = None
+    if per_file and config.plugins.CiefpSelectSatellite.per_file_fetch.value:
+        from .treefetch import RepositoryTree
+        tree = RepositoryTree(get_resolver().session, TREE_API_URL)
+    return SettingsDownloader(get_resolver(), TMP_DOWNLOAD, low_priority=low_priority, tree=tree)
@@ -0,0 +1,86 @@
+import os
+from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
+
+from .positions import parse_position
+
+_satellite_cache = {}
+
+
+def read_satellites(path):
+    """Return (name, position, flags) for every <sat> in satellites.xml, in file order.
+
+    The file is parsed as a stream: the attributes are taken when a <sat>
+    opens and every element is cleared as soon as it closes, so the
+    transponders are never held as a tree. The result is cached in memory
+    by path, size and mtime, and later calls for an unchanged file return
+    it without reading the file again.
+    """
+    st = os.stat(path)
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _satellite_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    satellites = []
+    root = None
+    with open(path, 'r', encoding='iso-8859-1') as f:
+        for event, elem in ElementTree.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                elif elem.tag == "sat":
+                    name = elem.get("name")
+                    try:
+                        position = int(elem.get("position"))
+                    except (TypeError, ValueError):
+                        position = parse_position(name or "")
+                    try:
+                        flags = int(elem.get("flags") or 0)
+                    except ValueError:
+                        flags = 0
+                    satellites.append((name, position, flags))
+                continue
+            elem.clear()
+            if elem.tag == "sat":
+                root.clear()
+    satellites = tuple(satellites)
+    _satellite_cache[path] = (key, satellites)
+    return satellites
+
+
+def prune_satellites_xml(path, positions):
+    """Rewrite satellites.xml in place, keeping only <sat> nodes at the given positions.
+
+    ``positions`` is a set of signed tenths of a degree, as in the ``position``
+    attribute. The file is parsed incrementally and each <sat> is written out
+    and released as soon as it is complete, so only one satellite's
+    transponders are held in memory. Returns ``(kept, dropped)``.
+    """
+    tmp_path = path + ".tmp"
+    kept = dropped = 0
+    root = None
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        for event, elem in ElementTree.iterparse(path, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                    attrs = "".join(f" {key}={quoteattr(value)}" for key, value in elem.attrib.items())
+                    out.write(f"<{elem.tag}{attrs}>\n")
+                continue
+            if elem.tag != "sat":
+                continue
+            try:
+                position = int(elem.get("position"))
+            except (TypeError, ValueError):
+                position = None
+            if position in positions:
+                elem.tail = "\n"
+                out.write("\t" + ElementTree.tostring(elem, encoding="unicode"))
+                kept += 1
+            else:
+                dropped += 1
+            root.clear()
+        out.write(f"</{root.tag}>\n")
+    os.replace(tmp_path, path)
+    return kept, dropped
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+
+class SatelliteSelection:
+    """Ordered set of selected satellites keyed by orbital position.
+
+    Positions are parsed once when the satellite list is loaded and passed
+    in with the name, so toggling is a dictionary operation and positions()
+    needs no parsing.
+    Entries without a position (e.g. terrestrial) are keyed by name.
+    """
+
+    def __init__(self):
+        self._items = OrderedDict()
+
+    @staticmethod
+    def key(name, position):
+        return name if position is None else position
+
+    def toggle(self, name, position=None):
+        """Select or deselect a satellite; returns True when it is now selected."""
+        key = self.key(name, position)
+        if key in self._items:
+            del self._items[key]
+            return False
+        self._items[key] = (name, position)
+        return True
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        return (name for name, position in self._items.values())
+
+    def names(self):
+        return [name for name, position in self._items.values()]
+
+    def positions(self):
+        return set(position for name, position in self._items.values() if position is not None)
@@ -0,0 +1,90 @@
+import queue
+import re
+import threading
+from collections import deque
+
+from .github import TIMEOUT
+
+UPDATE_LOG = "/tmp/CiefpSelectSatellite-update.log"
+TAIL_LINES = 5
+VERSION_REGEX = re.compile(r"^version=['\"]?([^'\"\s]+)", re.M)
+
+
+def parse_version(text):
+    """Turn '1.9' or 'v1.10' into a comparable tuple of numbers; () when there are none."""
+    return tuple(int(part) for part in re.findall(r"\d+", text or ""))
+
+
+def is_newer(remote, local):
+    return parse_version(remote) > parse_version(local)
+
+
+class VersionCheck(threading.Thread):
+    """Reads the version the installer script would install, off the GUI thread.
+
+    Posts ``("version", text)`` or ``("error", message)`` into ``messages``.
+    """
+
+    def __init__(self, session, installer_url):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.session = session
+        self.installer_url = installer_url
+        self.messages = queue.Queue()
+
+    def run(self):
+        try:
+            response = self.session.get(self.installer_url, timeout=TIMEOUT)
+            response.raise_for_status()
+            match = VERSION_REGEX.search(response.text)
+            if not match:
+                raise Exception("No version in the installer script.")
+            self.messages.put(("version", match.group(1)))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+
+class UpdateLog:
+    """Output of the installer: the full text on disk, the last lines in memory.
+
+    feed() takes the raw chunks from eConsoleAppContainer; the screen only
+    ever shows progress() or the last lines, so its text stays the same
+    size however much the installer prints.
+    """
+
+    def __init__(self, path=UPDATE_LOG, lines=TAIL_LINES):
+        self.path = path
+        self.lines = deque(maxlen=lines)
+        self.count = 0
+        self.pending = ""
+        try:
+            self.file = open(path, 'w', encoding='utf-8')
+        except (IOError, OSError):
+            self.file = None
+
+    def feed(self, data):
+        text = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+        if self.file is not None:
+            self.file.write(text)
+        parts = (self.pending + text).split("\n")
+        self.pending = parts.pop()
+        for line in parts:
+            line = line.strip()
+            if line:
+                self.lines.append(line)
+                self.count += 1
+
+    def progress(self):
+        last = self.lines[-1] if self.lines else ""
+        if len(last) > 60:
+            last = last[:57] + "..."
+        return f"Updating plugin... ({self.count} lines) {last}"
+
+    def close(self):
+        if self.pending.strip():
+            self.lines.append(self.pending.strip())
+            self.count += 1
+            self.pending = ""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,133 @@
+import os
+
+from .bouquets import marker_position
+from .lamedb import service_keys
+from .positions import namespace_position
+
+DVB_PREFIX = '#SERVICE 1:0:'
+
+
+class ServiceStats:
+    def __init__(self):
+        self.kept = 0
+        self.duplicates = 0
+        self.unreachable = 0
+        self.unselected = 0
+
+    def add(self, other):
+        self.kept += other.kept
+        self.duplicates += other.duplicates
+        self.unreachable += other.unreachable
+        self.unselected += other.unselected
+
+    def __str__(self):
+        return (f"{self.kept} services kept; {self.duplicates} duplicate, "
+                f"{self.unreachable} unreachable, {self.unselected} unselected dropped")
+
+
+def reference_key(line):
+    """Return the packed lamedb key of a '#SERVICE 1:0' line, or None for any other line.
+
+    The key has the same layout as lamedb.service_key, so a reference is
+    looked up in the service index without building a tuple or a string.
+    """
+    if not line.startswith(DVB_PREFIX):
+        return None
+    fields = line[9:].split(':', 8)
+    try:
+        return (int(fields[6], 16) << 48) | (int(fields[5], 16) << 32) | (int(fields[4], 16) << 16) | int(fields[3], 16)
+    except (IndexError, ValueError):
+        return None
+
+
+def key_position(key):
+    """Orbital position of a packed key, or None when its namespace carries none (streams, cable)."""
+    namespace = key >> 48
+    if not namespace >> 16:
+        return None
+    return namespace_position(namespace)
+
+
+def filter_service_lines(lines, selected, index, stats):
+    """Yield the stripped bouquet lines that belong to the selected positions.
+
+    A DVB service is placed by the namespace in its reference, falling back
+    to the satellite marker above it. Selected services missing from a
+    non-empty ``index`` are unreachable, and a service already seen in this
+    bouquet is a duplicate; both are dropped along with their
+    ``#DESCRIPTION``.
+    Markers of unselected positions and everything under them are dropped,
+    ``#NAME`` and lines outside any satellite section are kept.
+    """
+    seen = set()
+    section = None
+    keep = True
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith('#DESCRIPTION'):
+            if keep:
+                yield line
+            continue
+        if line.startswith('#NAME'):
+            keep = True
+        elif line.startswith('#SERVICE 1:64'):
+            position = marker_position(line)
+            section = None if position is None else position in selected
+            keep = section is not False
+        else:
+            key = reference_key(line)
+            position = None if key is None else key_position(key)
+            if position is None:
+                keep = section is not False
+            elif position not in selected:
+                stats.unselected += 1
+                keep = False
+            elif index and key not in index:
+                stats.unreachable += 1
+                keep = False
+            elif key in seen:
+                stats.duplicates += 1
+                keep = False
+            else:
+                seen.add(key)
+                stats.kept += 1
+                keep = True
+        if keep:
+            yield line
+
+
+def filter_service_bouquet(filename, selected, index):
+    """Filter a TV or radio bouquet in place; returns its ServiceStats, or None when nothing was left."""
+    stats = ServiceStats()
+    tmp_path = filename + ".tmp"
+    written = 0
+    with open(filename, 'r', errors='surrogateescape') as src, \
+            open(tmp_path, 'w', errors='surrogateescape') as dst:
+        for line in filter_service_lines(src, selected, index, stats):
+            dst.write(line + "\n")
+            written += 1
+    if not written:
+        os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, filename)
+    return stats
+
+
+def filter_service_bouquets(filenames, selected, lamedb_path):
+    """Filter bouquets against one selection and one index built from lamedb_path.
+
+    Returns (names of the files filtered, combined ServiceStats); a file
+    that nothing would be left of is not filtered and not in the names.
+    """
+    selected = frozenset(selected)
+    index = service_keys(lamedb_path) if os.path.exists(lamedb_path) else frozenset()
+    total = ServiceStats()
+    filtered = []
+    for filename in filenames:
+        stats = filter_service_bouquet(filename, selected, index)
+        if stats is not None:
+            total.add(stats)
+            filtered.append(os.path.basename(filename))
+    return filtered, total
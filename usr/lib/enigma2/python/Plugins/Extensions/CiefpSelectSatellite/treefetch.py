@@ -0,0 +1,144 @@
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .github import TIMEOUT
+from .manifest import BASE_FILES, SettingsManifest
+from .mapping import BOUQUET_INDEX, COMMON_FILES
+
+CHUNK_SIZE = 64 * 1024
+FETCH_WORKERS = 4
+
+
+class TreeUnavailable(Exception):
+    pass
+
+
+def blob_sha(path):
+    """Git blob sha1 of a file, as the contents API reports it for each file."""
+    digest = hashlib.sha1()
+    digest.update(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RepositoryTree:
+    """The unpacked settings folder in a GitHub repository, fetched file by file.
+
+    The contents listing gives the download URL, size and blob sha of every
+    file, so files already on disk with the same sha are not downloaded again
+    and the rest are fetched concurrently on a small thread pool sharing the
+    resolver's pooled session. Any network failure raises TreeUnavailable so
+    the caller can fall back to the archive.
+    """
+
+    def __init__(self, session, api_url, workers=FETCH_WORKERS):
+        self.session = session
+        self.api_url = api_url
+        self.workers = workers
+        self.files = None
+
+    def load(self):
+        try:
+            response = self.session.get(self.api_url, timeout=TIMEOUT)
+            response.raise_for_status()
+            listing = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise TreeUnavailable(str(e))
+        if not isinstance(listing, list):
+            raise TreeUnavailable("Unexpected listing.")
+        self.files = dict((entry["name"], entry) for entry in listing if entry.get("type") == "file")
+        return self.files
+
+    def __contains__(self, name):
+        return self.files is not None and name in self.files
+
+    def size(self, name):
+        return self.files[name].get("size") or 0
+
+    def version(self):
+        digest = hashlib.sha1()
+        for name in sorted(self.files):
+            digest.update(f"{name}:{self.files[name].get('sha')}\n".encode())
+        return digest.hexdigest()
+
+    def fetch_file(self, name, target_dir, should_stop=None):
+        """Download one file into target_dir unless it is already there; returns the bytes fetched."""
+        entry = self.files[name]
+        dest = os.path.join(target_dir, name)
+        if os.path.isfile(dest) and blob_sha(dest) == entry.get("sha"):
+            return 0
+        part_path = dest + ".part"
+        received = 0
+        response = self.session.get(entry["download_url"], stream=True, timeout=TIMEOUT)
+        try:
+            response.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if should_stop is not None:
+                        should_stop()
+                    f.write(chunk)
+                    received += len(chunk)
+        finally:
+            response.close()
+        if entry.get("size") is not None and received != entry["size"]:
+            os.remove(part_path)
+            raise TreeUnavailable(f"{name} is {received} bytes, expected {entry['size']}.")
+        os.replace(part_path, dest)
+        return received
+
+    def fetch(self, names, target_dir, should_stop=None):
+        """Fetch the named files concurrently; returns the total bytes downloaded."""
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir)
+        names = [name for name in names if name in self]
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                return sum(pool.map(lambda name: self.fetch_file(name, target_dir, should_stop), names))
+        except requests.RequestException as e:
+            raise TreeUnavailable(str(e))
+
+
+def tree_manifest(tree):
+    """The built-in mapping, limited to the files the repository tree has."""
+    index = {}
+    for key, bouquets in BOUQUET_INDEX.items():
+        present = [name for name in bouquets if name in tree]
+        if present:
+            index[key] = present
+    common_files = []
+    for name in BASE_FILES + COMMON_FILES:
+        if name in tree and name not in common_files:
+            common_files.append(name)
+    return SettingsManifest(index, common_files, tree.version())
+
+
+class FileFetcher(threading.Thread):
+    """Fetches a few files of the tree off the GUI thread.
+
+    Posts ``("done", bytes)``, ``("unavailable", message)`` when the tree
+    cannot be reached, or ``("error", message)`` into ``messages``, like
+    SettingsDownloader.
+    """
+
+    def __init__(self, tree, names, target_dir):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.tree = tree
+        self.names = names
+        self.target_dir = target_dir
+        self.messages = queue.Queue()
+
+    def run(self):
+        try:
+            self.messages.put(("done", self.tree.fetch(self.names, self.target_dir)))
+        except TreeUnavailable as e:
+            self.messages.put(("unavailable", str(e)))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
@@ -0,0 +1,541 @@
+import os
+from Components.Pixmap import Pixmap
+from Components.ActionMap import ActionMap
+from Components.Label import Label
+from Components.MenuList import MenuList
+from Components.config import config
+from Screens.MessageBox import MessageBox
+from Screens.Screen import Screen
+from Tools.Directories import fileExists
+from enigma import eConsoleAppContainer
+from enigma import eDVBDB
+from enigma import eTimer
+from .bouquets import merge_bouquet_lists, read_bouquet_list
+from .constants import PLUGIN_VERSION, TMP_DOWNLOAD, TMP_SELECTED, INSTALLER_URL, UPDATE_COMMAND
+from .core import load_satellites, read_staging, stage_selection
+from .installer import InstallState, InstallTransaction, file_hash, has_backup, read_backup, restore_backup
+from .manifest import builtin_manifest
+from .metrics import StageMetrics, directory_size, format_bytes
+from .resolver import get_resolver, settings_downloader
+from .selection import SatelliteSelection
+from .updater import BackgroundUpdater
+
+def backup_dir():
+    return os.path.join(config.plugins.CiefpSelectSatellite.cache_dir.value, "backup")
+
+
+def install_state_path():
+    return os.path.join(config.plugins.CiefpSelectSatellite.cache_dir.value, "install_state.json")
+
+
+def configured_positions():
+    """Orbital positions already set up in the tuner configuration, as signed tenths."""
+    try:
+        from Components.NimManager import nimmanager
+        return set(pos - 3600 if pos > 1800 else pos for pos in nimmanager.getConfiguredSats())
+    except Exception as e:
+        print(f"[CiefpSelectSatellite] Could not read configured satellites: {e}")
+        return set()
+
+
+class CiefpSelectSatellite(Screen):
+    """Satellite Selector - FHD Version (1920x1080)"""
+    
+    skin = """
+        <screen position="center,center" size="1920,1080"  backgroundColor="#011a2e">
+            <!-- Naslov -->
+            <widget name="title" position="0,20" size="1920,50" font="Bold;40" halign="center" title="..:: Ciefp Satellite Selector ::.." backgroundColor="#012e01" foregroundColor="#FFFFFF" zPosition="1" />
+            
+            <!-- Pozadinska slika -->
+            <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/CiefpSelectSatellite/background.png" position="1500,90" size="400,850" zPosition="0" />
+            
+            <!-- Lijeva lista - sateliti -->
+            <widget name="left_list" position="50,90" size="750,850" scrollbarMode="showOnDemand" itemHeight="35" font="Regular;28" backgroundColor="#011a2e" foregroundColor="#FFFFFF" zPosition="1" />
+            
+            <!-- Desna lista - odabrani sateliti -->
+            <widget name="right_list" position="820,90" size="650,850" scrollbarMode="showOnDemand" itemHeight="35" font="Regular;28" backgroundColor="#011a2e" foregroundColor="#00FF00" zPosition="1" />
+            
+            <!-- Status bar -->
+            <widget name="status" position="50,960" size="1820,50" font="Regular;26" halign="center" valign="center" foregroundColor="#00FF00" backgroundColor="#011a2e" transparent="1" zPosition="1" />
+            
+            <!-- Informacije o verziji -->
+            <widget name="version_info" position="1000,1020" size="900,30" font="Regular;24" halign="center" foregroundColor="#00FF00" backgroundColor="#011a2e" zPosition="1" />
+            
+            <!-- Donje dugmad -->
+            <widget name="red_button" position="50,1010" size="200,45" font="Bold;30" halign="center" backgroundColor="#9F1313" foregroundColor="#FFFFFF" zPosition="1" />
+            <widget name="green_button" position="270,1010" size="200,45" font="Bold;30" halign="center" backgroundColor="#1F771F" foregroundColor="#FFFFFF" zPosition="1" />
+            <widget name="yellow_button" position="490,1010" size="200,45" font="Bold;30" halign="center" backgroundColor="#9F9F13" foregroundColor="#000000" zPosition="1" />
+            <widget name="key_blue" position="710,1010" size="200,45" font="Bold;30" halign="center" backgroundColor="#13389F" foregroundColor="#FFFFFF" zPosition="1" />
+        </screen>
+    """.format(version=PLUGIN_VERSION)
+    
+    def __init__(self, session):
+        Screen.__init__(self, session)
+        self.session = session
+        self.selection = SatelliteSelection()
+        self.satellite_positions = {}
+        self.preview = None
+        self.manifest = builtin_manifest()
+        self.bouquet_index = self.manifest.index
+        self.downloader = None
+        self.download_timer = eTimer()
+        self.download_timer.callback.append(self.poll_download)
+        self.tree = None
+        self.fetcher = None
+        self.stage_after_download = False
+        self.fetch_timer = eTimer()
+        self.fetch_timer.callback.append(self.poll_fetch)
+        self.version_check = None
+        self.update_log = None
+        self.update_timer = eTimer()
+        self.update_timer.callback.append(self.poll_version_check)
+        self.metrics = StageMetrics()
+        
+        # UI Components
+        self["title"] = Label("..:: Ciefp Satellite Selector ::..")
+        self["left_list"] = MenuList([])
+        self["right_list"] = MenuList([])
+        self["status"] = Label("Initializing...")
+        self["version_info"] = Label(f"Version {PLUGIN_VERSION} - Loading...")
+        self["red_button"] = Label("Exit")
+        self["green_button"] = Label("Copy")
+        self["yellow_button"] = Label("Install")
+        self["key_blue"] = Label("Update")
+        
+        img_path = "/usr/lib/enigma2/python/Plugins/Extensions/CiefpSelectSatellite/background.png"
+        if not os.path.exists(img_path):
+            self.metrics.log(f"Background image not found at {img_path}")
+        
+        self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "DirectionActions", "MenuActions"],
+        {
+            "ok": self.select_item,
+            "cancel": self.exit,
+            "green": self.copy_files,
+            "yellow": self.install,
+            "red": self.red_pressed,
+            "blue": self.confirm_update,
+            "up": self.up,
+            "down": self.down,
+            "left": self.switch_left,
+            "right": self.switch_right,
+            "menu": self.confirm_rollback,
+        }, -1)
+        
+        # Keep the background updater from replacing TMP_DOWNLOAD while we stage from it
+        BackgroundUpdater.screen_opened()
+        self.onClose.append(BackgroundUpdater.screen_closed)
+        self.onLayoutFinish.append(self.download_settings)
+        self.onClose.append(self.cancel_download)
+        self.onClose.append(self.log_run)
+
+    def confirm_update(self):
+        if self.version_check is not None or self.update_log is not None:
+            return
+        from .selfupdate import VersionCheck
+        self["status"].setText("Checking for a new plugin version...")
+        self.version_check = VersionCheck(get_resolver().session, INSTALLER_URL)
+        self.version_check.start()
+        self.update_timer.start(200, False)
+
+    def poll_version_check(self):
+        if self.version_check is None or self.version_check.messages.empty():
+            return
+        kind, payload = self.version_check.messages.get_nowait()
+        self.update_timer.stop()
+        self.version_check = None
+        from .selfupdate import is_newer
+        if kind == "error":
+            self.session.openWithCallback(self.prompt_update, MessageBox,
+                                          f"Could not check the plugin version ({payload}).\nUpdate anyway?",
+                                          MessageBox.TYPE_YESNO)
+        elif is_newer(payload, PLUGIN_VERSION):
+            self.session.openWithCallback(self.prompt_update, MessageBox,
+                                          f"Version {payload} is available (installed: {PLUGIN_VERSION}).\nDo you want to update the plugin?",
+                                          MessageBox.TYPE_YESNO)
+        else:
+            self["status"].setText(f"The plugin is up to date (version {PLUGIN_VERSION}).")
+
+    def prompt_update(self, answer):
+        if answer:
+            self.update_plugin()
+
+    def update_plugin(self):
+        from .selfupdate import UpdateLog
+        self.update_log = UpdateLog()
+        self["status"].setText("Updating plugin...")
+        self.container = eConsoleAppContainer()
+        self.container.appClosed.append(self.update_finished)
+        self.container.dataAvail.append(self.update_output)
+        self.container.execute(UPDATE_COMMAND)
+
+    def update_output(self, data):
+        self.update_log.feed(data)
+        self["status"].setText(self.update_log.progress())
+
+    def update_finished(self, retval):
+        log = self.update_log
+        self.update_log = None
+        log.close()
+        if retval == 0:
+            self["status"].setText("The plugin has been successfully updated.")
+            self["version_info"].setText(f"Version {PLUGIN_VERSION} - Update successful!")
+        else:
+            last = log.lines[-1] if log.lines else ""
+            self["status"].setText(f"An error occurred while updating (see {log.path}): {last}")
+            self["version_info"].setText(f"Version {PLUGIN_VERSION} - Update failed!")
+
+    def parse_satellites(self):
+        xml_path = os.path.join(TMP_DOWNLOAD, "satellites.xml")
+        if not fileExists(xml_path):
+            self["status"].setText("Error: satellites.xml not found!")
+            return
+        self.metrics.start("parse")
+        try:
+            satellites = load_satellites(xml_path, self.bouquet_index)
+            self.satellite_positions = dict(satellites)
+            filtered_satellites = [(self.satellite_label(name, position), name) for name, position in satellites]
+            self["left_list"].setList(filtered_satellites)
+            self.metrics.finish("parse", os.path.getsize(xml_path))
+            self["status"].setText("Satellites loaded successfully.")
+            self["version_info"].setText(f"Version {PLUGIN_VERSION} - {len(filtered_satellites)} satellites found ({self.metrics.summary()})")
+        except Exception as e:
+            self.metrics.finish("parse", ok=False)
+            self["status"].setText(f"Error parsing XML: {str(e)}")
+
+    def download_settings(self, per_file=True):
+        self["status"].setText("Fetching file list from GitHub...")
+        self["red_button"].setText("Cancel")
+        self.metrics.start("download")
+        self.downloader = settings_downloader(per_file=per_file)
+        self.downloader.start()
+        self.download_timer.start(200, False)
+
+    def poll_download(self):
+        downloader = self.downloader
+        if downloader is None:
+            self.download_timer.stop()
+            return
+        while not downloader.messages.empty():
+            kind, payload = downloader.messages.get_nowait()
+            if kind == "status":
+                self["status"].setText(payload)
+            elif kind == "version":
+                self["version_info"].setText(f"Plugin Version {PLUGIN_VERSION} - Settings Version {payload}")
+            elif kind == "preview":
+                self.preview = payload
+            else:
+                self.download_finished(kind, payload)
+                return
+
+    def download_finished(self, kind, payload):
+        self.download_timer.stop()
+        self.metrics.finish("download", self.downloader.bytes_received, ok=kind == "done")
+        self.tree = self.downloader.tree if self.downloader.source == "tree" else None
+        self.downloader = None
+        self["red_button"].setText("Exit")
+        if kind == "done":
+            self.manifest = payload
+            self.bouquet_index = payload.index
+            self["status"].setText("Settings downloaded and extracted successfully.")
+            self.parse_satellites()
+            if self.stage_after_download:
+                self.stage_after_download = False
+                self.stage_files()
+        elif kind == "cancelled":
+            self.stage_after_download = False
+            self["status"].setText("Download cancelled.")
+        else:
+            self.stage_after_download = False
+            self["status"].setText(f"Error: {payload}")
+            self["version_info"].setText(f"Version {PLUGIN_VERSION} - {self.metrics.summary('download')}")
+
+    def cancel_download(self):
+        if self.downloader is not None:
+            self.downloader.cancel()
+
+    def red_pressed(self):
+        if self.downloader is not None:
+            self["status"].setText("Cancelling download...")
+            self.cancel_download()
+        else:
+            self.exit()
+
+    def satellite_label(self, name, position):
+        if self.preview is None or position is None:
+            return name
+        services, transponders, size = self.preview.get(position)
+        return f"{name}  ({services} ch, {transponders} tp, {format_bytes(size)})"
+
+    def select_item(self):
+        current = self["left_list"].getCurrent()
+        if current:
+            selected = current[1]
+            self.selection.toggle(selected, self.satellite_positions.get(selected))
+            self["right_list"].setList(self.selection.names())
+            if self.preview is None:
+                self["status"].setText(f"Selected {len(self.selection)} satellites")
+            else:
+                services, transponders, size = self.preview.total(self.selection.positions())
+                self["status"].setText(f"Selected {len(self.selection)} satellites: {services} channels, "
+                                       f"{transponders} transponders, about {format_bytes(size)}")
+
+    def copy_files(self):
+        if self.fetcher is not None or self.downloader is not None:
+            return
+        if self.tree is not None:
+            # Per-file mode: bring the selected satellites' bouquets up to date first
+            needed = [name for position in self.selection.positions()
+                      for name in self.manifest.index.get(position) or [] if name in self.tree]
+            if needed:
+                from .treefetch import FileFetcher
+                self["status"].setText(f"Downloading {len(needed)} bouquets...")
+                self.metrics.start("fetch")
+                self.fetcher = FileFetcher(self.tree, needed, TMP_DOWNLOAD)
+                self.fetcher.start()
+                self.fetch_timer.start(200, False)
+                return
+        self.stage_files()
+
+    def poll_fetch(self):
+        if self.fetcher is None or self.fetcher.messages.empty():
+            return
+        kind, payload = self.fetcher.messages.get_nowait()
+        self.fetch_timer.stop()
+        self.fetcher = None
+        if kind == "done":
+            self.metrics.finish("fetch", payload)
+            self.stage_files()
+        elif kind == "unavailable":
+            # Same fallback as the initial download: take the archive, then stage from it
+            self.metrics.finish("fetch", ok=False)
+            self.tree = None
+            self.stage_after_download = True
+            self.download_settings(per_file=False)
+            self["status"].setText(f"Per-file source unavailable ({payload}), downloading the archive...")
+        else:
+            self.metrics.finish("fetch", ok=False)
+            self["status"].setText(f"Download error: {payload}")
+
+    def stage_files(self):
+        self.metrics.start("copy")
+        try:
+            plugin_config = config.plugins.CiefpSelectSatellite
+            prune_satellites = plugin_config.prune_satellites.value
+            files, service_stats = stage_selection(TMP_DOWNLOAD, get_resolver().cache.archive_path, self.manifest,
+                                                   self.selection.positions(), TMP_SELECTED,
+                                                   prune_lamedb_file=plugin_config.prune_lamedb.value,
+                                                   prune_satellites_file=prune_satellites,
+                                                   keep_positions=configured_positions() if prune_satellites else (),
+                                                   report=self.metrics.log)
+
+            self.metrics.finish("copy", directory_size(TMP_SELECTED))
+            self["status"].setText(f"Files copied successfully! ({service_stats.duplicates} duplicate, "
+                                   f"{service_stats.unreachable} unreachable services dropped)")
+            self["version_info"].setText(f"Version {PLUGIN_VERSION} - {len(self.selection)} satellites copied ({self.metrics.summary('copy')})")
+        except Exception as e:
+            self.metrics.finish("copy", ok=False)
+            self["status"].setText(f"Copy error: {str(e)}")
+
+    def parse_bouquets_file(self, bouquets_path):
+        bouquets = []
+        try:
+            with open(bouquets_path, 'r') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line or line.startswith("#NAME"):
+                        bouquets.append((line + "\n", None))
+                    elif "FROM BOUQUET" in line:
+                        start = line.find('"') + 1
+                        end = line.find('"', start)
+                        if start != -1 and end != -1:
+                            bouquet_file = line[start:end]
+                            bouquets.append((line + "\n", bouquet_file))
+        except Exception as e:
+            print(f"Greška pri čitanju bouquets.tv: {e}")
+        return bouquets
+
+    def downloaded_bouquets(self, source_dir, top_lists):
+        """Userbouquets referenced by the downloaded bouquets.tv/.radio, or by the staged ones."""
+        names = set()
+        for top in top_lists:
+            path = os.path.join(TMP_DOWNLOAD, top)
+            if not os.path.exists(path):
+                path = os.path.join(source_dir, top)
+            if os.path.exists(path):
+                names.update(bouquet_file for line, bouquet_file in read_bouquet_list(path) if bouquet_file)
+        return names
+
+    def foreign_bouquets(self, available, state, enigma2_dir):
+        """Staged shared userbouquets whose installed file is the user's own, not one we installed."""
+        satellite_bouquets = set()
+        for bouquets in self.manifest.index.values():
+            satellite_bouquets.update(bouquets)
+        foreign = set()
+        for f in available:
+            dest = os.path.join(enigma2_dir, f)
+            if (f.startswith("userbouquet.") and f not in satellite_bouquets
+                    and os.path.isfile(dest) and dest not in state.files):
+                foreign.add(f)
+        return foreign
+
+    def merge_bouquets(self, merged_path, bouquets, installed_path, ciefp_names, available):
+        # The staged list is left as downloaded, so installing again merges from the same input
+        installed = read_bouquet_list(installed_path) if os.path.exists(installed_path) else []
+        merged = merge_bouquet_lists(installed, bouquets, ciefp_names, available)
+        with open(merged_path, 'w') as file:
+            file.writelines(line for line, bouquet_file in merged)
+
+    def process_and_copy_bouquets(self, bouquets_file_path, available, transaction, enigma2_dir, ciefp_names=None):
+        try:
+            bouquets = self.parse_bouquets_file(bouquets_file_path)
+            if not bouquets:
+                self["status"].setText("Nema validnih buketa!")
+                return
+            name = os.path.basename(bouquets_file_path)
+            if ciefp_names is not None:
+                merged_path = bouquets_file_path + ".merged"
+                self.merge_bouquets(merged_path, bouquets, os.path.join(enigma2_dir, name), ciefp_names, available)
+                transaction.add(merged_path, enigma2_dir, name=name)
+            else:
+                # Staging already dropped the entries whose bouquet is not in the set
+                transaction.add(bouquets_file_path, enigma2_dir)
+        except Exception as e:
+            self["status"].setText(f"Greška: {str(e)}")
+
+    def install(self):
+        self.session.openWithCallback(
+            self.install_confirmed,
+            MessageBox,
+            "Install selected settings?",
+            MessageBox.TYPE_YESNO
+        )
+
+    def install_confirmed(self, result):
+        if result:
+            self.metrics.start("install")
+            try:
+                enigma2_dir = "/etc/enigma2"
+                tuxbox_dir = "/etc/tuxbox"
+                source_dir = TMP_SELECTED
+                staged = read_staging(source_dir)
+
+                if not staged:
+                    self.metrics.finish("install", ok=False)
+                    self["status"].setText("Greška: Nema fajlova za instalaciju!")
+                    return
+
+                differential = config.plugins.CiefpSelectSatellite.differential_install.value
+                state = InstallState(install_state_path())
+                transaction = InstallTransaction(backup_dir(), state)
+                available = set(staged)
+                ciefp_names = None
+                if config.plugins.CiefpSelectSatellite.merge_bouquets.value:
+                    top_lists = ("bouquets.tv", "bouquets.radio")
+                    # The user's own favourites and the like keep their file and their list entry
+                    foreign = self.foreign_bouquets(available, state, enigma2_dir)
+                    available -= foreign
+                    if foreign:
+                        self.metrics.log(f"Kept the installed {', '.join(sorted(foreign))}")
+                    # Bouquets installed by earlier runs count as ours even when the new list drops them
+                    ciefp_names = set(os.path.basename(dest) for dest in state.installed())
+                    ciefp_names = (ciefp_names | self.downloaded_bouquets(source_dir, top_lists)) - foreign
+                else:
+                    top_lists = ("bouquets.tv",)
+                for top in top_lists:
+                    if top in available:
+                        self.process_and_copy_bouquets(os.path.join(source_dir, top), available, transaction, enigma2_dir, ciefp_names)
+
+                for f in sorted(available):
+                    src = os.path.join(source_dir, f)
+                    if f == "satellites.xml":
+                        transaction.add(src, tuxbox_dir, digest=staged[f]["md5"])
+                    elif f in top_lists:
+                        continue
+                    elif f.endswith(('.tv', '.radio', 'lamedb')):
+                        transaction.add(src, enigma2_dir, digest=staged[f]["md5"])
+
+                if differential:
+                    # Ciefp bouquets installed earlier that the current selection no longer has
+                    wanted = transaction.destinations()
+                    for dest in state.installed():
+                        name = os.path.basename(dest)
+                        if os.path.dirname(dest) == enigma2_dir and name.startswith("userbouquet.") and dest not in wanted:
+                            transaction.remove(dest)
+
+                written = transaction.commit()
+                self.metrics.finish("install", sum(os.path.getsize(dest) for dest in written if os.path.exists(dest)))
+                self.metrics.log(f"Installed {len(written)} files, removed {len(transaction.removed)}, {len(transaction.skipped)} unchanged")
+                if not differential:
+                    self.reload_settings()
+                elif written or transaction.removed:
+                    self.reload_settings(services=os.path.join(enigma2_dir, "lamedb") in written)
+                else:
+                    self["status"].setText("Installed settings are already up to date.")
+                    return
+                self["status"].setText("Instalacija uspešna!")
+                self["version_info"].setText(f"Version {PLUGIN_VERSION} - Installation complete! ({self.metrics.summary('install')})")
+            except Exception as e:
+                if "install" in self.metrics.started:
+                    self.metrics.finish("install", ok=False)
+                self["status"].setText(f"Greška: {str(e)}")
+
+    def confirm_rollback(self):
+        if not has_backup(backup_dir()):
+            self["status"].setText("No backup of a previous installation found.")
+            return
+        self.session.openWithCallback(self.rollback_confirmed, MessageBox,
+                                      "Restore the settings from before the last installation?",
+                                      MessageBox.TYPE_YESNO)
+
+    def rollback_confirmed(self, result):
+        if result:
+            try:
+                entries = read_backup(backup_dir())
+                restored = restore_backup(backup_dir())
+                state = InstallState(install_state_path())
+                for entry in entries:
+                    path = entry["path"]
+                    # Files an earlier install of ours wrote are still ours once put back
+                    if entry["backup"] is not None and entry.get("owned", True) and os.path.isfile(path):
+                        state.record(path, file_hash(path))
+                    else:
+                        state.forget(path)
+                state.save()
+                self.reload_settings()
+                self["status"].setText(f"Previous settings restored ({len(restored)} files).")
+            except Exception as e:
+                self["status"].setText(f"Rollback error: {str(e)}")
+
+    def reload_settings(self, services=True):
+        self.metrics.start("reload")
+        try:
+            if services:
+                eDVBDB.getInstance().reloadServicelist()
+            eDVBDB.getInstance().reloadBouquets()
+            self.metrics.finish("reload")
+            self.session.open(MessageBox, "Reload successful! New settings are now active.\n.::ciefpsettings::.", MessageBox.TYPE_INFO, timeout=5)
+        except Exception as e:
+            self.metrics.finish("reload", ok=False)
+            self.session.open(MessageBox, "Reload failed: " + str(e), MessageBox.TYPE_ERROR, timeout=5)
+
+    def log_run(self):
+        if self.metrics.results:
+            self.metrics.log(f"Run summary: {self.metrics.summary()}")
+
+    def up(self):
+        self["left_list"].up()
+
+    def down(self):
+        self["left_list"].down()
+
+    def switch_left(self):
+        self["left_list"].selectionEnabled(True)
+
+    def switch_right(self):
+        self["left_list"].selectionEnabled(False)
+
+    def exit(self):
+        self.download_timer.stop()
+        self.fetch_timer.stop()
+        self.update_timer.stop()
+        self.close()
@@ -0,0 +1,133 @@
+import os
+import time
+
+from Components.config import config
+from enigma import eTimer
+
+from .constants import TMP_DOWNLOAD
+from .metrics import StageMetrics
+
+FIRST_CHECK = 5 * 60
+BUSY_RETRY = 15 * 60
+RETRY_MIN = 5 * 60
+RECORDING_MARGIN = 10 * 60
+POLL_INTERVAL = 1000
+
+
+class BackgroundUpdater:
+    """Keeps the settings cache current while the plugin screen is closed.
+
+    Started from the session-start hook, it checks the GitHub listing every
+    ``update_interval`` hours and lets a low-priority SettingsDownloader
+    fetch and extract a new archive, or in per-file mode refresh the
+    changed common files. The screen then finds the cache, the extracted
+    files and the parsed satellite list ready. Checks are put off
+    while a recording runs or is about to start, or while the plugin screen
+    is open (it stages from the extracted files and must not see them
+    replaced), and failed checks (network down) are retried with
+    exponential backoff up to the normal interval.
+    """
+
+    instance = None
+    screens = 0
+
+    @classmethod
+    def start(cls, session):
+        if cls.instance is None:
+            cls.instance = cls(session)
+            cls.instance.schedule(FIRST_CHECK)
+        return cls.instance
+
+    @classmethod
+    def screen_opened(cls):
+        cls.screens += 1
+
+    @classmethod
+    def screen_closed(cls):
+        cls.screens = max(cls.screens - 1, 0)
+
+    def __init__(self, session):
+        self.session = session
+        self.downloader = None
+        self.failures = 0
+        self.metrics = StageMetrics()
+        self.check_timer = eTimer()
+        self.check_timer.callback.append(self.check)
+        self.poll_timer = eTimer()
+        self.poll_timer.callback.append(self.poll)
+
+    def interval(self):
+        return config.plugins.CiefpSelectSatellite.update_interval.value * 3600
+
+    def schedule(self, seconds):
+        self.check_timer.stop()
+        self.check_timer.startLongTimer(int(seconds))
+
+    def recording(self):
+        try:
+            nav = self.session.nav
+            if nav.getRecordings():
+                return True
+            next_recording = nav.RecordTimer.getNextRecordingTime()
+        except Exception:
+            return False
+        if next_recording is None or next_recording < 0:
+            return False
+        return next_recording - time.time() < RECORDING_MARGIN
+
+    def check(self):
+        if not config.plugins.CiefpSelectSatellite.background_update.value:
+            self.schedule(self.interval())
+            return
+        if self.downloader is not None:
+            return
+        if self.screens:
+            self.metrics.log("Plugin screen open, background update postponed.")
+            self.schedule(BUSY_RETRY)
+            return
+        if self.recording():
+            self.metrics.log("Recording in progress, background update postponed.")
+            self.schedule(BUSY_RETRY)
+            return
+        from .resolver import settings_downloader
+        self.downloader = settings_downloader(low_priority=True)
+        self.downloader.start()
+        self.poll_timer.start(POLL_INTERVAL, False)
+
+    def poll(self):
+        downloader = self.downloader
+        while downloader is not None and not downloader.messages.empty():
+            kind, payload = downloader.messages.get_nowait()
+            if kind in ("done", "error", "cancelled"):
+                self.finished(kind, payload)
+                return
+
+    def finished(self, kind, payload):
+        self.poll_timer.stop()
+        self.downloader = None
+        if kind == "done":
+            self.failures = 0
+            self.prepare(payload)
+            self.schedule(self.interval())
+        else:
+            self.failures += 1
+            delay = min(RETRY_MIN * 2 ** (self.failures - 1), self.interval())
+            self.metrics.log(f"Background update failed ({payload}), next try in {delay // 60} min.")
+            self.schedule(delay)
+
+    def prepare(self, manifest):
+        """Parse satellites.xml now so the screen opens from the cached list."""
+        xml_path = os.path.join(TMP_DOWNLOAD, "satellites.xml")
+        if os.path.exists(xml_path):
+            from .core import load_satellites
+            try:
+                load_satellites(xml_path, manifest.index)
+            except Exception as e:
+                self.metrics.log(f"Could not parse {xml_path}: {e}")
+
+    def stop(self):
+        self.check_timer.stop()
+        self.poll_timer.stop()
+        if self.downloader is not None:
+            self.downloader.cancel()
+            self.downloader = None